@@ -1,11 +1,15 @@
+import time
+_started = time.perf_counter()
+
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import datetime
-import pandas as pd
+import importlib
+import sys
 
-from signal_engine import generate_signals_multi
-from stock_engine import generate_stock_signals, get_suggested_stocks
-from telegram_alert import send_telegram_message, log_trade
+from trade_store import log_trades, query_trades, count_trades, STRATEGIES, PAGE_SIZE
+from signal_worker import SignalWorker
+import metrics
 
 # Set page config
 st.set_page_config(page_title="📈 Options Signal Generator", layout="wide")
@@ -14,8 +18,49 @@ st.title("📊 Automated Options Signal Generator")
 # Auto-refresh every 10 minutes
 st_autorefresh(interval=600000, limit=None, key="main_autorefresh")
 
+# Engines (pandas, yfinance, ta, requests) are imported on the first scan, not at startup,
+# so a cold start only pays for the page shell
+def load_module(name):
+    module = sys.modules.get(name)
+    if module is None:
+        with metrics.timer(f"import.{name}"):
+            module = importlib.import_module(name)
+    return module
+
+def run_index_signals(index, strike_type, expiry_date, confirm_on=()):
+    return load_module("signal_engine").generate_signals_multi(index, strike_type, expiry_date, confirm_on)
+
+def stream_suggested_stocks(expiry_date, strategy, strike_type):
+    yield from load_module("stock_engine").stream_suggested_stocks(expiry_date, strategy, strike_type)
+
+def run_stock_signal(stock, strategy, strike_type, expiry_date):
+    return load_module("stock_engine").generate_stock_signals(stock, strategy, strike_type, expiry_date)
+
+# One background worker per server process, shared by every session
+@st.cache_resource
+def get_signal_worker():
+    return SignalWorker().start()
+
+@st.cache_resource
+def get_telegram_dispatcher():
+    return load_module("telegram_alert").TelegramDispatcher(coalesce=True)
+
+worker = get_signal_worker()
+
+def send_to_telegram(messages, rows):
+    dispatcher = get_telegram_dispatcher()
+    queued = dispatcher.submit(messages, rows, on_sent=log_trades)
+    if queued:
+        st.info(f"📤 {queued} signal(s) queued for Telegram")
+    else:
+        st.info("📤 Already sent to Telegram")
+    errors = dispatcher.status()["errors"]
+    if errors:
+        st.error(f"❌ Telegram: {errors[-1]}")
+
 # Tab selector
 mode = st.radio("Choose Mode", ["📊 Index Options", "📦 Stock Options"])
+metrics.record("app.shell", time.perf_counter() - _started)
 
 # ---------- Index Options ----------
 if mode == "📊 Index Options":
@@ -23,29 +68,38 @@ if mode == "📊 Index Options":
     index = st.sidebar.selectbox("Select Index", ["NIFTY", "BANKNIFTY", "SENSEX"])
     strike_type = st.sidebar.radio("Strike Type", ["ATM", "ITM", "OTM"])
     expiry_date = st.sidebar.date_input("Expiry Date", datetime.date.today())
+    confirm_on = tuple(st.sidebar.multiselect("Confirm on Timeframes", ["15min", "1h"]))
     auto_send = st.sidebar.checkbox("📤 Auto-Send to Telegram", value=True)
 
     if st.sidebar.button("🚀 Generate Index Signals"):
-        with st.spinner("Analyzing index..."):
-            signals_df, index_ltp = generate_signals_multi(index, strike_type, expiry_date)
+        job_key = ("index", index, strike_type, expiry_date, confirm_on)
+        snapshot = worker.latest(job_key)
+        if snapshot is None:
+            with st.spinner("Analyzing index..."):
+                snapshot = worker.run_now(job_key, run_index_signals, index, strike_type, expiry_date, confirm_on)
+        else:
+            worker.subscribe(job_key, run_index_signals, index, strike_type, expiry_date, confirm_on)
+        if snapshot is None:
+            st.error(f"❌ Index scan failed: {worker.last_error(job_key)}. Retrying in the background.")
+        else:
+            scanned_at, (signals_df, index_ltp) = snapshot
+            st.caption(f"🕒 Last scan: {datetime.datetime.fromtimestamp(scanned_at):%H:%M:%S}")
             if not signals_df.empty:
                 st.success(f"✅ {len(signals_df)} Signals Found")
                 st.markdown(f"**📈 Index LTP:** ₹{index_ltp}")
+                messages, rows = [], []
                 for _, row in signals_df.iterrows():
                     st.write(row)
 
-                    msg = (
+                    messages.append(
                         f"🔍 Signal: {row['Signal']}\n"
                         f"📈 Index LTP: ₹{row['Index LTP']}\n"
                         f"💸 Entry: ₹{row['Entry']} | 🌟 Target: ₹{row['Target']} | 🚑 SL: ₹{row['Stop Loss']}\n"
                         f"📊 Strategy: {row['Strategy']} | 🦓 Expiry: {row['Expiry']}"
                     )
-                    if auto_send:
-                        sent = send_telegram_message(msg)
-                        if sent:
-                            log_trade(row)
-                        else:
-                            st.error("❌ Failed to send to Telegram")
+                    rows.append(row)
+                if auto_send:
+                    send_to_telegram(messages, rows)
             else:
                 st.warning("⚠️ No strong signals found.")
 
@@ -59,17 +113,34 @@ elif mode == "📦 Stock Options":
 
     # Smart suggestions
     st.subheader("🧐 Suggested Stocks with Signals")
-    with st.spinner("Scanning F&O stocks..."):
-        suggested = get_suggested_stocks(expiry_date, strategy, strike_type)
-        suggested_symbols = [sym for sym, df in suggested]
-
-    selected_stock = st.selectbox("Select a Suggested Stock", suggested_symbols)
+    scan_key = ("suggested", expiry_date, strategy, strike_type)
+    worker.subscribe(scan_key, stream_suggested_stocks, expiry_date, strategy, strike_type)
+    snapshot = worker.latest(scan_key)
+    complete = worker.is_complete(scan_key)
+    scan_error = worker.last_error(scan_key)
+    if not complete and not scan_error:
+        # Poll until the first scan finishes (it may not have started yet on a first visit);
+        # the 10-minute refresh takes over after that
+        st_autorefresh(interval=3000, limit=None, key="scan_autorefresh")
+    suggested = snapshot[1] if snapshot else []
+    scores = {sym: df["Score"].iloc[0] for sym, df in suggested}
+    if scan_error:
+        st.error(f"❌ Last scan failed: {scan_error}. Retrying in the background.")
+    elif snapshot is None:
+        st.info("⏳ Scanning F&O stocks in the background. Suggestions will appear as they qualify.")
+    elif not complete:
+        st.caption(f"⏳ Scanning... {len(suggested)} qualified so far, best first")
+    else:
+        st.caption(f"🕒 Last scan: {datetime.datetime.fromtimestamp(snapshot[0]):%H:%M:%S}")
+
+    selected_stock = st.selectbox("Select a Suggested Stock", list(scores),
+                                  format_func=lambda sym: f"{sym} (score {scores[sym]})")
     manual_symbol = st.text_input("Or search manually (e.g., RELIANCE, BHEL)")
 
     if st.button("🚀 Generate Stock Signal"):
         stock_to_check = manual_symbol.strip().upper() if manual_symbol else selected_stock
         with st.spinner(f"Analyzing {stock_to_check}..."):
-            signal_df = generate_stock_signals(stock_to_check, strategy, strike_type, expiry_date)
+            signal_df = run_stock_signal(stock_to_check, strategy, strike_type, expiry_date)
             if not signal_df.empty:
                 st.success("✅ Signal Generated")
                 st.write(f"📈 Stock LTP: ₹{signal_df.iloc[0]['Stock LTP']}")
@@ -84,21 +155,42 @@ elif mode == "📦 Stock Options":
                 )
 
                 if auto_send:
-                    sent = send_telegram_message(msg)
-                    if sent:
-                        log_trade(row)
-                    else:
-                        st.error("❌ Failed to send to Telegram")
+                    send_to_telegram([msg], [row])
             else:
                 st.warning("⚠️ No valid signal or option chain for this stock.")
 
+# ---------- Diagnostics ----------
+if st.sidebar.checkbox("🩺 Show Diagnostics", value=False):
+    st.markdown("## 🩺 Pipeline Diagnostics")
+    snap = metrics.snapshot()
+    col_timers, col_counters = st.columns([3, 1])
+    col_timers.dataframe([{"Stage": name, **stat} for name, stat in snap["timers"].items()],
+                         use_container_width=True)
+    col_counters.dataframe([{"Counter": name, "Value": value} for name, value in snap["counters"].items()],
+                           use_container_width=True)
+    st.dataframe([{"Cache": name, **stat} for name, stat in load_module("memo").stats().items()],
+                 use_container_width=True)
+    telegram_status = get_telegram_dispatcher().status()
+    st.caption(f"📤 Telegram: {telegram_status['sent']} sent, {telegram_status['failed']} failed, "
+               f"{telegram_status['duplicates']} deduped, {telegram_status['pending']} pending")
+    if st.button("♻️ Reset Metrics"):
+        metrics.reset()
+
 # ---------- Trade History ----------
 st.markdown("## 📘 Trade History")
-try:
-    df_log = pd.read_csv("trade_log.csv")
+total_trades = count_trades()
+if total_trades:
+    col_strategy, col_symbol, col_page = st.columns(3)
+    strategy_filter = col_strategy.selectbox("Filter by Strategy", ["All"] + STRATEGIES)
+    symbol_filter = col_symbol.text_input("Filter by Symbol").strip().upper()
+    strategy_filter = None if strategy_filter == "All" else strategy_filter
+    matching = count_trades(strategy=strategy_filter, symbol=symbol_filter or None)
+    pages = max(1, -(-matching // PAGE_SIZE))
+    page = col_page.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+    df_log = query_trades(page, strategy=strategy_filter, symbol=symbol_filter or None)
     st.dataframe(df_log, use_container_width=True)
-    st.info(f"📌 Total Trades Logged: {len(df_log)}")
-except FileNotFoundError:
+    st.info(f"📌 Total Trades Logged: {total_trades}")
+else:
     st.warning("No trade history yet.")
 
 # ---------- Disclaimer Footer ----------
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pricing import bs_price, option_levels, BARS_PER_YEAR, HORIZON_DAYS, MIN_T, STOP_MOVE
+from signal_engine import calculate_indicators, evaluate_strategies, STRATEGIES
+from stock_engine import evaluate_stock_signals
+
+SESSION_BARS = 75       # 5-minute bars in an NSE session
+MAX_HOLD_BARS = SESSION_BARS
+VWAP_SESSIONS = 5       # live engines anchor VWAP at the start of the 5-day download
+VOL_WINDOW = 375        # five sessions of 5-minute bars
+EXPIRY_DAYS = 3.5       # average days left on the weekly contract a signal trades
+CHUNK_SIZE = 4096
+
+OUTCOME_TARGET = "Target Hit"
+OUTCOME_SL = "SL Hit"
+OUTCOME_EXPIRY = "Expired"
+
+# ---------------------- PREMIUM MODEL ----------------------
+def rolling_vol(close, window=VOL_WINDOW):
+    returns = np.log(close).diff()
+    return (returns.rolling(window, min_periods=window // 5).std() * np.sqrt(BARS_PER_YEAR)).to_numpy()
+
+def model_premium(close, vol, days=EXPIRY_DAYS):
+    # No option history exists, so price an ATM contract the way the live engines
+    # price strikes missing from the chain: Black-Scholes on historical volatility
+    return np.round(bs_price(close, close, days / 365, vol, True), 2)
+
+def trade_levels(spot, premium, vol, direction, days=EXPIRY_DAYS):
+    # The live engines' option_levels for the ATM contract bought at `premium`, plus the
+    # underlying prices at which they are reached: option_levels reprices after a one-sigma
+    # move over HORIZON_DAYS (target) and STOP_MOVE of it against the trade (stop)
+    entry, target, stop = option_levels(spot, spot, days / 365, vol, direction > 0, entry=premium)
+    move = spot * vol * np.sqrt(HORIZON_DAYS / 365)
+    return entry, target, stop, spot + direction * move, spot - direction * STOP_MOVE * move
+
+def expiry_value(entry, spot, exit_spot, vol, direction, held_bars, days=EXPIRY_DAYS):
+    # Premium of a trade still open after max_hold: the model's change applied to the entry,
+    # with the time held taken off the contract
+    t = days / 365
+    later = np.maximum(t - held_bars / SESSION_BARS / 365, MIN_T)
+    change = bs_price(exit_spot, spot, later, vol, direction > 0) - bs_price(spot, spot, t, vol, direction > 0)
+    return np.maximum(entry + change, 0.0)
+
+# ---------------------- INDICATORS ----------------------
+def rolling_session_vwap(df, sessions=VWAP_SESSIONS):
+    # Reproduces the live VWAP, which is cumulative from the first bar of a `sessions`-day download
+    session_dates = df.index.normalize() if isinstance(df.index, pd.DatetimeIndex) else np.zeros(len(df))
+    session_id = pd.factorize(session_dates)[0]
+    session_start = np.flatnonzero(np.r_[True, session_id[1:] != session_id[:-1]])
+    anchor = session_start[np.maximum(session_id - (sessions - 1), 0)]
+
+    typical = (df["High"] + df["Low"] + df["Close"]).to_numpy(dtype=float) / 3
+    volume = df["Volume"].to_numpy(dtype=float)
+    cum_pv = np.r_[0.0, np.cumsum(volume * typical)]
+    cum_v = np.r_[0.0, np.cumsum(volume)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = (cum_pv[1:] - cum_pv[anchor]) / (cum_v[1:] - cum_v[anchor])
+    return pd.Series(vwap, index=df.index)
+
+def strategy_signals(df, rules="index"):
+    df = calculate_indicators(df)
+    df["VWAP"] = rolling_session_vwap(df)
+    if rules == "stock":
+        return df, pd.DataFrame({"Stock": evaluate_stock_signals(df)})
+    signals = evaluate_strategies(df)
+    signals.loc[~signals["Volume OK"], STRATEGIES] = None
+    return df, signals[STRATEGIES]
+
+# ---------------------- BAR WALK ----------------------
+def resolve_exits(high, low, close, entries, direction, target_level, stop_level, max_hold=MAX_HOLD_BARS):
+    # For each entry bar, find the first later bar where the underlying reaches the trade's
+    # target or stop level (see trade_levels); trades reaching neither exit after max_hold bars.
+    n = len(close)
+    pad = np.full(max_hold, np.nan)
+    high_windows = sliding_window_view(np.r_[high[1:], pad], max_hold)
+    low_windows = sliding_window_view(np.r_[low[1:], pad], max_hold)
+
+    exit_idx = np.empty(len(entries), dtype=np.int64)
+    outcome = np.empty(len(entries), dtype=object)
+
+    for start in range(0, len(entries), CHUNK_SIZE):
+        sl_ = slice(start, start + CHUNK_SIZE)
+        e, d = entries[sl_], direction[sl_, None]
+        h, l = high_windows[e], low_windows[e]
+        favourable = np.where(d > 0, h, l) * d
+        adverse = np.where(d > 0, l, h) * d
+        target_hit = favourable >= (target_level[sl_] * direction[sl_])[:, None]
+        stop_hit = adverse <= (stop_level[sl_] * direction[sl_])[:, None]
+
+        first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), max_hold)
+        first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), max_hold)
+        last_bar = np.minimum(e + max_hold, n - 1)
+
+        # A bar that spans both levels is booked as a stop, the conservative reading
+        is_stop = (first_stop < max_hold) & (first_stop <= first_target)
+        is_target = ~is_stop & (first_target < max_hold)
+        exit_idx[sl_] = np.where(is_stop, e + 1 + first_stop,
+                                 np.where(is_target, e + 1 + first_target, last_bar))
+        outcome[sl_] = np.where(is_stop, OUTCOME_SL, np.where(is_target, OUTCOME_TARGET, OUTCOME_EXPIRY))
+
+    return exit_idx, outcome
+
+def _take_sequential(entries, exit_idx):
+    # One open position per strategy: skip signals raised while a trade is still running
+    taken = []
+    i = 0
+    while i < len(entries):
+        taken.append(i)
+        i = np.searchsorted(entries, exit_idx[i], side="right")
+    return np.asarray(taken, dtype=np.int64)
+
+# ---------------------- BACKTEST ----------------------
+def run_backtest(df, rules="index", max_hold=MAX_HOLD_BARS, premium_fn=None):
+    df, signals = strategy_signals(df, rules)
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    close = df["Close"].to_numpy(dtype=float)
+    vols = rolling_vol(df["Close"])
+    if premium_fn is None:
+        premiums = model_premium(close, vols)
+    else:
+        premiums = np.asarray(premium_fn(close), dtype=float)
+    priced = np.isfinite(premiums) & (premiums > 0) & np.isfinite(vols) & (vols > 0)
+
+    trades = []
+    for strategy in signals.columns:
+        column = signals[strategy].to_numpy(dtype=object)
+        is_buy = column == "BUY"
+        is_sell = column == "SELL"
+        # The last bar has nothing to walk forward into
+        entries = np.flatnonzero(((is_buy | is_sell) & priced)[:-1])
+        if not len(entries):
+            continue
+
+        direction = np.where(is_buy[entries], 1, -1)
+        spot, vol = close[entries], vols[entries]
+        # Exit at the same target and stop premiums the live signal would have shown
+        premium, target, stop, target_level, stop_level = trade_levels(spot, premiums[entries], vol, direction)
+        exit_idx, outcome = resolve_exits(high, low, close, entries, direction, target_level, stop_level,
+                                          max_hold=max_hold)
+        keep = _take_sequential(entries, exit_idx)
+        expired = expiry_value(premium, spot, close[exit_idx], vol, direction, exit_idx - entries)
+        pnl = np.where(outcome == OUTCOME_SL, stop, np.where(outcome == OUTCOME_TARGET, target, expired)) - premium
+
+        trades.append(pd.DataFrame({
+            "Strategy": strategy,
+            "Signal": np.where(direction[keep] > 0, "BUY", "SELL"),
+            "Entry Time": df.index[entries[keep]],
+            "Exit Time": df.index[exit_idx[keep]],
+            "Entry": premium[keep],
+            "Outcome": outcome[keep],
+            "Profit": np.round(pnl[keep], 2),
+        }))
+
+    if not trades:
+        return pd.DataFrame(), pd.DataFrame()
+    trades = pd.concat(trades, ignore_index=True)
+    return trades, summarize(trades)
+
+def run_backtest_universe(frames, rules="stock", max_hold=MAX_HOLD_BARS):
+    all_trades = []
+    for symbol, df in frames.items():
+        if df.empty:
+            continue
+        trades, _ = run_backtest(df, rules=rules, max_hold=max_hold)
+        if not trades.empty:
+            trades.insert(0, "Symbol", symbol)
+            all_trades.append(trades)
+    if not all_trades:
+        return pd.DataFrame(), pd.DataFrame()
+    trades = pd.concat(all_trades, ignore_index=True)
+    return trades, summarize(trades)
+
+def max_drawdown(pnl):
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.r_[0.0, equity])[1:]
+    return float((peak - equity).max()) if len(equity) else 0.0
+
+def summarize(trades):
+    trades = trades.sort_values("Entry Time", kind="stable")
+    summary = trades.groupby("Strategy").agg(
+        Trades=("Outcome", "count"),
+        Wins=("Outcome", lambda x: (x == OUTCOME_TARGET).sum()),
+        Losses=("Outcome", lambda x: (x == OUTCOME_SL).sum()),
+        Expired=("Outcome", lambda x: (x == OUTCOME_EXPIRY).sum()),
+        Total_PnL=("Profit", "sum"),
+        Avg_PnL=("Profit", "mean"),
+        Max_Drawdown=("Profit", lambda x: max_drawdown(x.to_numpy())),
+    )
+    summary["Win %"] = (summary["Wins"] / summary["Trades"] * 100).round(2)
+    summary[["Total_PnL", "Avg_PnL", "Max_Drawdown"]] = summary[["Total_PnL", "Avg_PnL", "Max_Drawdown"]].round(2)
+    return summary.reset_index()
@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+
+import metrics
+
+STORE_DIR = os.environ.get("BAR_STORE_DIR", ".bar_store")
+MARKET_TZ = "Asia/Kolkata"
+IST_OFFSET = 5 * 60 * 60 + 30 * 60
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+INTERVAL = "5m"
+BOOTSTRAP_PERIOD = "60d"   # Yahoo keeps ~60 days of 5-minute bars
+STALE_AFTER = 55 * 86400   # seconds; older stores cannot be topped up and are re-bootstrapped
+MIN_REFRESH = 60           # seconds before the same symbol is topped up again
+CHUNK_SIZE = 50            # tickers per yfinance request
+OHLC_BASE_URL = os.environ.get("OHLC_BASE_URL")   # replay server instead of Yahoo, when set
+REQUEST_TIMEOUT = 30
+
+_locks = {}
+_locks_guard = threading.Lock()
+_last_refresh = {}
+_inflight = {}             # ticker -> Event set once the download fetching it has finished
+
+# ---------------------- Paths & Locks ----------------------
+def _path(ticker):
+    safe = ticker.replace("^", "_").replace("/", "_")
+    return os.path.join(STORE_DIR, f"{safe}.npy")
+
+def _lock(ticker):
+    with _locks_guard:
+        return _locks.setdefault(ticker, threading.Lock())
+
+# ---------------------- Disk I/O ----------------------
+# Each symbol is one (n, 6) float64 array: epoch seconds followed by OHLCV,
+# so a single atomic rename publishes a consistent file.
+def _read(ticker):
+    path = _path(ticker)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode="r")
+
+def _write(ticker, arr):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _path(ticker)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(arr, dtype=np.float64))
+    os.replace(tmp, path)
+
+def _to_array(index, ohlcv):
+    if index.tz is None:
+        index = index.tz_localize(MARKET_TZ)
+    arr = np.empty((len(index), 6), dtype=np.float64)
+    arr[:, 0] = index.as_unit("s").asi8
+    arr[:, 1:] = ohlcv
+    return arr
+
+def _to_frame(arr):
+    index = pd.to_datetime(arr[:, 0].astype(np.int64), unit="s", utc=True).tz_convert(MARKET_TZ)
+    return pd.DataFrame(arr[:, 1:], index=index, columns=COLUMNS, copy=False)
+
+def _session_start(arr, days):
+    # Row where the last `days` trading sessions begin (what yfinance's period="5d" returns)
+    if not days or not len(arr):
+        return 0
+    session = (arr[:, 0].astype(np.int64) + IST_OFFSET) // 86400
+    boundaries = np.flatnonzero(np.r_[True, session[1:] != session[:-1]])
+    return int(boundaries[-days]) if len(boundaries) >= days else 0
+
+def _merge_array(ticker, new, replace=False):
+    # Replace stored bars from the first new timestamp on (the old last bar may have been partial)
+    with _lock(ticker):
+        old = None if replace else _read(ticker)
+        if old is not None and len(old):
+            keep = np.searchsorted(old[:, 0], new[0, 0], side="left")
+            new = np.concatenate([old[:keep], new])
+        _write(ticker, new)
+
+def load_bars(ticker, days=None, max_age=None):
+    arr = _read(ticker)
+    if arr is None or not len(arr):
+        return pd.DataFrame()
+    if max_age is not None and time.time() - arr[-1, 0] > max_age:
+        # A store the last refresh could not bring up to date; months-old bars are not signals
+        print(f"Bar store: {ticker} is stale (last bar {pd.Timestamp(int(arr[-1, 0]), unit='s', tz='UTC')})")
+        return pd.DataFrame()
+    arr = arr[_session_start(arr, days):]
+    metrics.incr("bars.loaded", len(arr))
+    return _to_frame(arr)
+
+def last_timestamp(ticker):
+    arr = _read(ticker)
+    if arr is None or not len(arr):
+        return None
+    return pd.Timestamp(int(arr[-1, 0]), unit="s", tz="UTC")
+
+# ---------------------- yfinance Top-Up ----------------------
+def _column_view(values, positions):
+    # Basic slicing keeps a view into the download; only scattered columns force a copy
+    step = positions[1] - positions[0]
+    if step > 0 and np.all(np.diff(positions) == step):
+        return values[:, positions[0]:positions[-1] + 1:step]
+    return values[:, positions]
+
+def _split_download(data, tickers):
+    # yfinance returns one (ticker, field) MultiIndex frame for the whole chunk. Pull its
+    # values out once and hand each ticker a column view instead of copying sub-frames.
+    split = {}
+    if data is None or data.empty:
+        return split
+    values = data.to_numpy(dtype=np.float64, copy=False)
+    columns = data.columns
+    if not isinstance(columns, pd.MultiIndex):
+        positions = columns.get_indexer(COLUMNS)
+        if (positions >= 0).all():
+            split[tickers[0]] = _column_view(values, positions)
+    else:
+        level = 0 if tickers[0] in columns.get_level_values(0) else 1
+        for ticker in tickers:
+            keys = [(ticker, c) if level == 0 else (c, ticker) for c in COLUMNS]
+            positions = columns.get_indexer(keys)
+            if (positions >= 0).all():
+                split[ticker] = _column_view(values, positions)
+
+    index = data.index
+    for ticker, ohlcv in list(split.items()):
+        valid = ~np.isnan(ohlcv).any(axis=1)
+        if not valid.any():
+            del split[ticker]
+        elif valid.all():
+            split[ticker] = _to_array(index, ohlcv)
+        else:
+            split[ticker] = _to_array(index[valid], ohlcv[valid])
+    return split
+
+def _download(tickers, start=None):
+    kwargs = {"start": start} if start is not None else {"period": BOOTSTRAP_PERIOD}
+    metrics.incr("yfinance.requests")
+    metrics.incr("yfinance.tickers", len(tickers))
+    with metrics.timer("yfinance.download"):
+        if OHLC_BASE_URL:
+            return _download_http(tickers, start)
+        data = yf.download(tickers if len(tickers) > 1 else tickers[0], interval=INTERVAL,
+                           progress=False, auto_adjust=True, group_by="ticker", threads=True, **kwargs)
+    return _split_download(data, tickers)
+
+def _download_http(tickers, start=None, retries=3, backoff=0.5):
+    # GET {OHLC_BASE_URL}/ohlc answers {ticker: [[epoch_s, open, high, low, close, volume], ...]},
+    # already in the store's row layout
+    params = {"tickers": ",".join(tickers), "interval": INTERVAL}
+    if start is not None:
+        params["start"] = int(start.timestamp())
+    else:
+        params["period"] = BOOTSTRAP_PERIOD
+    for attempt in range(retries):
+        try:
+            response = requests.get(OHLC_BASE_URL + "/ohlc", params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            break
+        except requests.RequestException:
+            if attempt == retries - 1:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+    return {ticker: np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+            for ticker, rows in response.json().items() if rows}
+
+def refresh(tickers, chunk_size=CHUNK_SIZE):
+    # Fetch only the bars after what is already stored: per chunk, one call for stored
+    # tickers (from the oldest last bar among them) and one bootstrap call for new ones.
+    # Tickers another scan is already downloading are waited on rather than fetched again
+    now = time.time()
+    due, joined = [], []
+    with _locks_guard:
+        for ticker in dict.fromkeys(tickers):
+            if ticker in _inflight:
+                joined.append(_inflight[ticker])
+            elif now - _last_refresh.get(ticker, 0) >= MIN_REFRESH:
+                _inflight[ticker] = threading.Event()
+                due.append(ticker)
+    metrics.incr("bar_store.fresh", len(set(tickers)) - len(due) - len(joined))
+    metrics.incr("bar_store.joined", len(joined))
+    try:
+        _refresh_due(due, chunk_size, now)
+    finally:
+        with _locks_guard:
+            for ticker in due:
+                _inflight.pop(ticker).set()
+    for event in joined:
+        event.wait()
+
+def _refresh_due(due, chunk_size, now):
+    stored, cold = {}, []
+    oldest = pd.Timestamp(now - STALE_AFTER, unit="s", tz="UTC")
+    for ticker in due:
+        ts = last_timestamp(ticker)
+        if ts is None or ts < oldest:
+            # Nothing stored, or too far behind for Yahoo to fill the gap: bootstrap afresh
+            cold.append(ticker)
+        else:
+            stored[ticker] = ts
+
+    batches = []
+    # Chunk by last bar so one lagging ticker does not pull a whole chunk's start back
+    stored_list = sorted(stored, key=stored.get)
+    for i in range(0, len(stored_list), chunk_size):
+        chunk = stored_list[i:i + chunk_size]
+        batches.append((chunk, min(stored[t] for t in chunk)))
+    for i in range(0, len(cold), chunk_size):
+        batches.append((cold[i:i + chunk_size], None))
+
+    for batch, start in batches:
+        try:
+            arrays = _download(batch, start)
+        except Exception as e:
+            print("Bar store download error:", e)
+            continue
+        for ticker, arr in arrays.items():
+            # A bootstrap replaces whatever stale file was there instead of leaving a gap
+            _merge_array(ticker, arr, replace=start is None)
+        for ticker in batch:
+            _last_refresh[ticker] = now
+
+def get_bars(ticker, days=5):
+    refresh([ticker])
+    return load_bars(ticker, days, max_age=STALE_AFTER)
+
+def get_bars_batch(tickers, days=5, chunk_size=CHUNK_SIZE):
+    refresh(tickers, chunk_size)
+    frames = {}
+    for ticker in tickers:
+        df = load_bars(ticker, days, max_age=STALE_AFTER)
+        if not df.empty:
+            frames[ticker] = df
+    return frames
@@ -0,0 +1,94 @@
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from pricing import bs_price
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+MARKET_TZ = "Asia/Kolkata"
+BARS_PER_SESSION = 75
+INDEX_SPOTS = {"NIFTY": 24000.0, "BANKNIFTY": 52000.0, "SENSEX": 80000.0}
+INDEX_TICKERS = {"^NSEI": "NIFTY", "^NSEBANK": "BANKNIFTY", "^BSESN": "SENSEX"}
+
+# Recorded payloads (see record_fixtures.py) are used when present; otherwise a
+# deterministic synthetic stand-in of realistic size is generated per symbol.
+
+def _seed(name):
+    return sum(ord(c) * (i + 1) for i, c in enumerate(name))
+
+def _recorded(name):
+    path = os.path.join(FIXTURE_DIR, name)
+    return path if os.path.exists(path) else None
+
+# ---------------------- F&O Universe ----------------------
+def fo_symbols(count=180):
+    path = _recorded("fo_stocks.json")
+    if path:
+        with open(path) as f:
+            return sorted({item["symbol"] for item in json.load(f).get("data", []) if item.get("symbol")})[:count]
+    return [f"STOCK{i:03d}" for i in range(count)]
+
+def fo_payload(count=180):
+    return {"data": [{"symbol": s} for s in fo_symbols(count)]}
+
+# ---------------------- Option Chains ----------------------
+def _spot(symbol):
+    return INDEX_SPOTS.get(symbol, 200.0 + _seed(symbol) % 3000)
+
+def option_chain_payload(symbol, expiries=4, strikes_per_expiry=120, today=None):
+    path = _recorded(f"option_chain_{symbol}.json")
+    if path:
+        with open(path) as f:
+            return json.load(f)
+
+    rng = np.random.default_rng(_seed(symbol))
+    spot = _spot(symbol)
+    step = 50 if symbol in INDEX_SPOTS else max(round(spot / 100 / 2.5) * 2.5, 2.5)
+    atm = round(spot / step) * step
+    strikes = atm + step * (np.arange(strikes_per_expiry) - strikes_per_expiry // 2)
+    today = today or date.today()
+    records = []
+    for k in range(expiries):
+        expiry = today + timedelta(days=7 * k + (3 - today.weekday()) % 7)
+        t = max((expiry - today).days, 1) / 365
+        vol = 0.12 + 0.3 * np.abs(np.log(strikes / spot)) + rng.uniform(0, 0.02, len(strikes))
+        ce = bs_price(spot, strikes, t, vol, True)
+        pe = bs_price(spot, strikes, t, vol, False)
+        for i, strike in enumerate(strikes):
+            records.append({
+                "strikePrice": float(strike),
+                "expiryDate": expiry.strftime("%d-%b-%Y"),
+                "CE": {"lastPrice": round(float(ce[i]), 2), "openInterest": int(rng.integers(0, 200000)),
+                       "impliedVolatility": round(float(vol[i]) * 100, 2), "totalTradedVolume": int(rng.integers(0, 1e6))},
+                "PE": {"lastPrice": round(float(pe[i]), 2), "openInterest": int(rng.integers(0, 200000)),
+                       "impliedVolatility": round(float(vol[i]) * 100, 2), "totalTradedVolume": int(rng.integers(0, 1e6))},
+            })
+    return {"records": {"data": records, "underlyingValue": spot}}
+
+# ---------------------- OHLC Bars ----------------------
+def ohlc_frame(ticker, sessions=60, end=None):
+    path = _recorded(f"ohlc_{ticker.replace('^', '_')}.csv")
+    if path:
+        df = pd.read_csv(path, index_col=0)
+        df.index = pd.to_datetime(df.index, utc=True).tz_convert(MARKET_TZ)
+        return df
+
+    rng = np.random.default_rng(_seed(ticker))
+    end = end or pd.Timestamp.now(tz=MARKET_TZ).normalize()
+    days = pd.bdate_range(end=end.tz_localize(None), periods=sessions)
+    offsets = pd.to_timedelta(np.arange(BARS_PER_SESSION) * 5 + 9 * 60 + 15, unit="min")
+    index = pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel()).tz_localize(MARKET_TZ)
+    n = len(index)
+    spot = _spot(INDEX_TICKERS.get(ticker, ticker.replace(".NS", "")))
+    close = spot * np.exp(np.cumsum(rng.normal(0, 0.0012, n)))
+    spread = close * rng.uniform(0.0002, 0.002, n)
+    return pd.DataFrame({
+        "Open": np.r_[close[0], close[:-1]],
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 50_000, n).astype(float),
+    }, index=index)
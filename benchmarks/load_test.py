@@ -0,0 +1,167 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.replay_server import ReplayServer
+
+# Market-open load over real HTTP: concurrent universe scans, index scans and Telegram
+# dispatch against the replay server, with its latency and error injection applied.
+#   python -m benchmarks.load_test --symbols 200 --scans 4 --latency 0.05 --error-rate 0.02
+
+SCAN_SETTINGS = [("Safe", "ATM"), ("Max Profit", "OTM"), ("Reversal", "ITM"), ("Breakout", "ATM"),
+                 ("Min Investment", "ATM"), ("Safe", "ITM"), ("Max Profit", "ATM"), ("Reversal", "OTM")]
+
+def point_at(server, workdir):
+    # Must run before the engines are imported; they read these at import time
+    os.environ.update({
+        "NSE_BASE_URL": server.url,
+        "OHLC_BASE_URL": server.url,
+        "TELEGRAM_API_URL": server.url,
+        "TELEGRAM_BOT_TOKEN": "replay",
+        "TELEGRAM_CHAT_ID": "1",
+        "BAR_STORE_DIR": os.path.join(workdir, "bars"),
+        "TRADE_DB_PATH": os.path.join(workdir, "trades.db"),
+    })
+
+def run_concurrently(jobs):
+    # jobs: {name: fn}; returns {name: (seconds, result or exception)}
+    results = {}
+
+    def run(name, fn):
+        start = time.perf_counter()
+        try:
+            outcome = fn()
+        except Exception as e:
+            outcome = e
+        results[name] = (time.perf_counter() - start, outcome)
+
+    threads = [threading.Thread(target=run, args=item) for item in jobs.items()]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def timed_scan(stream):
+    # (first suggestion latency, final ranked list) for one streaming scan
+    start = time.perf_counter()
+    first, ranked = None, []
+    for ranked in stream:
+        if ranked and first is None:
+            first = time.perf_counter() - start
+    return first, ranked
+
+def wait_for_dispatch(dispatcher, submitted, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = dispatcher.status()
+        if status["sent"] + status["failed"] >= submitted:
+            return status
+        time.sleep(0.1)
+    return dispatcher.status()
+
+def run_load(args, workdir):
+    import memo
+    import metrics
+    import signal_engine
+    import stock_engine
+    from telegram_alert import TelegramDispatcher
+    from trade_store import log_trades, count_trades
+
+    expiry = datetime.date.today()
+    report = {"phases": {}}
+
+    def phase(name, jobs):
+        start = time.perf_counter()
+        results = run_concurrently(jobs)
+        errors = [f"{job}: {out}" for job, (_, out) in results.items() if isinstance(out, Exception)]
+        report["phases"][name] = {
+            "wall_s": round(time.perf_counter() - start, 3),
+            "slowest_s": round(max(sec for sec, _ in results.values()), 3),
+            "errors": errors,
+        }
+        print(f"{name:<24} {report['phases'][name]['wall_s']:>8.2f}s wall  "
+              f"{report['phases'][name]['slowest_s']:>8.2f}s slowest  {len(errors)} errors")
+        return results
+
+    settings = SCAN_SETTINGS[:args.scans]
+    scan_jobs = {f"{strategy}/{strike}": (lambda s=strategy, k=strike: timed_scan(
+        stock_engine.stream_suggested_stocks(expiry, s, k, screen=args.screen))) for strategy, strike in settings}
+    index_jobs = {index: (lambda i=index: signal_engine.generate_signals_multi(i, "ATM", expiry))
+                  for index in ["NIFTY", "BANKNIFTY", "SENSEX"]}
+
+    # Market open: nothing cached locally, every session asks at once
+    cold = phase("market_open_cold", {**scan_jobs, **index_jobs})
+    # The next rerun inside the same bar should be served from the bar store and memo layers
+    phase("rerun_same_bar", {**scan_jobs, **index_jobs})
+
+    # Few synthetic symbols qualify, so also price every symbol as if it had: one option
+    # chain fetch, OI lookup and pricing pass per symbol on the scan's worker count
+    def build_all():
+        frames = stock_engine.fetch_stock_data_batch(stock_engine.get_nse_fo_stocks())
+        limiter = stock_engine.RateLimiter(args.rate_limit)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            built = pool.map(lambda item: stock_engine.build_stock_signal(
+                item[0], "BUY", item[1], "Safe", "ATM", expiry, limiter), frames.items())
+            return sum(not df.empty for df in built)
+    report["chains_priced"] = phase("oi_all_symbols", {"build_all": build_all})["build_all"][1]
+
+    scans = [out for _, out in (cold[name] for name in scan_jobs) if not isinstance(out, Exception)]
+    firsts = [first for first, _ in scans if first is not None]
+    report["first_suggestion_s"] = round(min(firsts), 3) if firsts else None
+
+    # Telegram: real signal rows plus filler traffic through one coalescing dispatcher
+    dispatcher = TelegramDispatcher(coalesce=True)
+    rows = [df.iloc[0] for _, ranked in scans for _, df in ranked]
+    messages = [f"🔍 Signal: {row['Signal']}\n💸 Entry: ₹{row['Entry']}" for row in rows]
+    start = time.perf_counter()
+    submitted = dispatcher.submit(messages, rows, on_sent=log_trades)
+    submitted += dispatcher.submit([f"load-test filler {i}" for i in range(args.messages)])
+    status = wait_for_dispatch(dispatcher, submitted, timeout=120)
+    report["telegram"] = {k: v for k, v in status.items() if k != "errors"}
+    report["telegram"]["seconds"] = round(time.perf_counter() - start, 3)
+    report["trades_logged"] = count_trades()
+    print(f"{'telegram_dispatch':<24} {report['telegram']['seconds']:>8.2f}s  "
+          f"{status['sent']} sent, {status['failed']} failed")
+
+    report["metrics"] = metrics.snapshot()
+    report["memo"] = memo.stats()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the signal pipeline against the replay server")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--scans", type=int, default=4, help="concurrent universe scans (distinct settings)")
+    parser.add_argument("--screen", choices=["thread", "process"], default="thread")
+    parser.add_argument("--messages", type=int, default=200, help="filler Telegram messages")
+    parser.add_argument("--rate-limit", type=float, default=0, help="option-chain calls/s in oi_all_symbols (0: none)")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    server = ReplayServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          symbols=args.symbols).start()
+    with tempfile.TemporaryDirectory() as workdir:
+        point_at(server, workdir)
+        try:
+            report = run_load(args, workdir)
+        finally:
+            server.stop()
+    report["server"] = server.stats()
+    print(json.dumps({"server": report["server"], "counters": report["metrics"]["counters"]}, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    failed = any(p["errors"] for p in report["phases"].values())
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
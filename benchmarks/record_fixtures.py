@@ -0,0 +1,38 @@
+import argparse
+import json
+import os
+
+import yfinance as yf
+
+import nse_client
+from benchmarks.fixtures import FIXTURE_DIR
+
+# Capture live NSE/Yahoo payloads once so benchmarks replay real data offline:
+#   python -m benchmarks.record_fixtures --symbols RELIANCE TCS --indices NIFTY
+
+def main():
+    parser = argparse.ArgumentParser(description="Record NSE and yfinance fixtures for offline benchmarks")
+    parser.add_argument("--indices", nargs="*", default=["NIFTY", "BANKNIFTY"])
+    parser.add_argument("--symbols", nargs="*", default=[])
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(os.path.join(FIXTURE_DIR, "fo_stocks.json"), "w") as f:
+        json.dump(nse_client.get_fo_stock_payload(), f)
+
+    for index in args.indices:
+        with open(os.path.join(FIXTURE_DIR, f"option_chain_{index}.json"), "w") as f:
+            json.dump(nse_client.get_option_chain(index, "indices"), f)
+    for symbol in args.symbols:
+        with open(os.path.join(FIXTURE_DIR, f"option_chain_{symbol}.json"), "w") as f:
+            json.dump(nse_client.get_option_chain(symbol, "equities"), f)
+
+    tickers = [{"NIFTY": "^NSEI", "BANKNIFTY": "^NSEBANK", "SENSEX": "^BSESN"}[i] for i in args.indices]
+    tickers += [s + ".NS" for s in args.symbols]
+    for ticker in tickers:
+        df = yf.download(ticker, period="60d", interval="5m", progress=False, auto_adjust=True, multi_level_index=False)
+        df.to_csv(os.path.join(FIXTURE_DIR, f"ohlc_{ticker.replace('^', '_')}.csv"))
+        print("Recorded", ticker, len(df), "bars")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from benchmarks import fixtures
+
+# Local stand-in for NSE, the OHLC feed and the Telegram Bot API. Replays recorded fixtures
+# (or the synthetic ones) over real HTTP, with optional latency and injected failures:
+#   python -m benchmarks.replay_server --port 8765 --latency 0.05 --error-rate 0.02
+# then point the app at it:
+#   NSE_BASE_URL=http://127.0.0.1:8765 OHLC_BASE_URL=http://127.0.0.1:8765 \
+#   TELEGRAM_API_URL=http://127.0.0.1:8765 TELEGRAM_BOT_TOKEN=x TELEGRAM_CHAT_ID=1 streamlit run app.py
+
+SEND_MESSAGE = re.compile(r"^/bot[^/]+/sendMessage$")
+RETRY_AFTER = 1          # seconds a replayed Telegram 429 asks the client to wait
+
+# ---------------------- Request Handler ----------------------
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/json", headers=()):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        replay = self.server.replay
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/__stats":
+            return self._send(200, replay.stats())
+
+        route = "nse.home" if url.path == "/" else url.path.strip("/").replace("/", ".")
+        if replay.before(route):
+            return self._send(503, {"error": "injected"})
+        if url.path == "/":
+            # NSE hands out session cookies on the home page before its APIs answer
+            return self._send(200, b"ok", "text/html", [("Set-Cookie", "nsit=replay; Max-Age=300; Path=/")])
+        if url.path.startswith("/api/option-chain-"):
+            return self._send(200, replay.option_chain(query.get("symbol", "")))
+        if url.path == "/api/liveEquity-derivatives":
+            return self._send(200, replay.fo_list())
+        if url.path == "/ohlc":
+            tickers = [t for t in query.get("tickers", "").split(",") if t]
+            start = int(query["start"]) if "start" in query else None
+            return self._send(200, replay.ohlc(tickers, start))
+        self._send(404, {"error": f"no replay for {url.path}"})
+
+    def do_POST(self):
+        replay = self.server.replay
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+        path = urlparse(self.path).path
+        if not SEND_MESSAGE.match(path):
+            return self._send(404, {"ok": False, "description": "Not Found"})
+        if replay.before("telegram.send"):
+            return self._send(429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                                    "parameters": {"retry_after": RETRY_AFTER}})
+        try:
+            message = json.loads(body)
+            text, chat_id = message["text"], message["chat_id"]
+        except (ValueError, KeyError):
+            return self._send(400, {"ok": False, "error_code": 400, "description": "Bad Request"})
+        if len(text) > 4096:
+            return self._send(400, {"ok": False, "error_code": 400, "description": "message is too long"})
+        self._send(200, {"ok": True, "result": replay.record_message(chat_id, text)})
+
+# ---------------------- Replay Server ----------------------
+class ReplayServer:
+    # Serves fixtures from a background thread; every response is JSON built once per key
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 symbols=200, sessions=10, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.symbols = symbols
+        self.sessions = sessions
+        self.messages = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._errors = Counter()
+        self._payloads = {}
+        self._bars = {}
+        self.httpd = ThreadingHTTPServer((host, port), ReplayHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.replay = self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def before(self, route):
+        # Count the request, sleep the configured latency, and say whether to fail it
+        with self._lock:
+            self._counts[route] += 1
+            delay = max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self._errors[route] += 1
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def _cached(self, key, build):
+        payload = self._payloads.get(key)
+        if payload is None:
+            payload = self._payloads[key] = json.dumps(build()).encode()
+        return payload
+
+    def option_chain(self, symbol):
+        return self._cached(("chain", symbol), lambda: fixtures.option_chain_payload(symbol))
+
+    def fo_list(self):
+        return self._cached("fo", lambda: fixtures.fo_payload(self.symbols))
+
+    def ohlc(self, tickers, start=None):
+        out = {}
+        for ticker in tickers:
+            bars = self._bars.get(ticker)
+            if bars is None:
+                df = fixtures.ohlc_frame(ticker, sessions=self.sessions)
+                bars = np.column_stack([df.index.as_unit("s").asi8, df.to_numpy(dtype=np.float64)])
+                self._bars[ticker] = bars
+            if start is not None:
+                bars = bars[bars[:, 0] >= start]
+            out[ticker] = bars.tolist()
+        return out
+
+    def record_message(self, chat_id, text):
+        with self._lock:
+            self.messages.append(text)
+            return {"message_id": len(self.messages), "chat": {"id": chat_id}, "text": text}
+
+    def stats(self):
+        with self._lock:
+            return {"requests": dict(self._counts), "injected_errors": dict(self._errors),
+                    "messages": len(self.messages)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay NSE, OHLC and Telegram responses locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failed")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=10, help="trading days of 5-minute bars")
+    args = parser.parse_args()
+
+    server = ReplayServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                          args.symbols, args.sessions).start()
+    print(f"Replaying on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
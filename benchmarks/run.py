@@ -0,0 +1,156 @@
+import argparse
+import datetime
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import bar_store
+import memo
+import metrics
+import nse_client
+from benchmarks import fixtures
+
+# Offline benchmark suite: every engine runs against fixture payloads with the NSE
+# and Yahoo calls answered locally, so scan throughput can be tracked over time.
+#   python -m benchmarks.run --json bench.json
+#   python -m benchmarks.run --baseline bench.json --tolerance 0.25
+
+# ---------------------- Offline Sources ----------------------
+def _fake_nse_json(path, retries=3, backoff=0.5):
+    parsed = urlparse(path)
+    symbol = parse_qs(parsed.query).get("symbol", [""])[0]
+    if parsed.path.startswith("/api/option-chain-"):
+        return fixtures.option_chain_payload(symbol)
+    if parsed.path == "/api/liveEquity-derivatives":
+        return fixtures.fo_payload()
+    raise ValueError(f"No fixture for {path}")
+
+def _fake_download(tickers, start=None, period=None, **kwargs):
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    frames = {}
+    for ticker in tickers:
+        df = fixtures.ohlc_frame(ticker)
+        frames[ticker] = df[df.index >= start] if start is not None else df
+    return pd.concat(frames, axis=1)
+
+def install_offline_sources(store_dir):
+    nse_client.get_json = _fake_nse_json
+    bar_store.yf.download = _fake_download
+    bar_store.STORE_DIR = store_dir
+
+def reset_caches():
+    nse_client.clear_cache()
+    bar_store._last_refresh.clear()
+    memo.clear()
+
+# ---------------------- Benchmarks ----------------------
+def bench(name, fn, repeat=1, units=None):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    result = {"name": name, "seconds": round(best, 4), "repeat": repeat}
+    if units:
+        result["per_second"] = round(units / best, 1)
+    print(f"{name:<32} {best * 1000:>10.1f} ms" + (f"  {result['per_second']:>10.1f}/s" if units else ""))
+    return result
+
+def cold_import(modules):
+    # A fresh interpreter each run, so nothing is already in sys.modules
+    subprocess.run([sys.executable, "-c", f"import {modules}"], check=True)
+
+def run_suite(symbols, repeat):
+    from signal_engine import generate_signals_multi
+    from stock_engine import scan_fo_universe, check_signal, build_stock_signal
+    from option_chain import OptionChain
+    from pricing import PricedChain
+    from backtest_engine import run_backtest_universe
+    from indicators import reset_indicators
+    from parallel_screen import screen_frames
+
+    expiry = datetime.date.today()
+    universe = fixtures.fo_symbols(symbols)
+    results = []
+
+    # What a scaled-to-zero container pays before the page shell renders, and on the first scan
+    results.append(bench("import_page_shell", lambda: cold_import(
+        "streamlit, streamlit_autorefresh, trade_store, signal_worker, metrics"), repeat))
+    results.append(bench("import_engines", lambda: cold_import("signal_engine, stock_engine"), repeat))
+
+    results.append(bench("universe_scan_cold", lambda: list(
+        scan_fo_universe(expiry, symbols=universe, rate_limit=0)), units=len(universe)))
+    bar_store._last_refresh.clear()
+    results.append(bench("universe_scan_warm_store", lambda: list(
+        scan_fo_universe(expiry, symbols=universe, rate_limit=0)), repeat, units=len(universe)))
+
+    reset_caches()
+    results.append(bench("index_signals_cold", lambda: generate_signals_multi("NIFTY", "ATM", expiry)))
+    results.append(bench("index_signals_warm", lambda: generate_signals_multi("NIFTY", "ATM", expiry), repeat))
+
+    frames = {s: fixtures.ohlc_frame(s + ".NS").iloc[-5 * fixtures.BARS_PER_SESSION:] for s in universe}
+    results.append(bench("check_signal_full", lambda: [check_signal(df.copy()) for df in frames.values()],
+                         repeat, units=len(frames)))
+    reset_indicators()
+    [check_signal(df, s) for s, df in frames.items()]
+    results.append(bench("check_signal_streaming", lambda: [check_signal(df, s) for s, df in frames.items()],
+                         repeat, units=len(frames)))
+    screen_frames(frames)  # spawn the pool outside the timed runs
+    results.append(bench("check_signal_process_pool", lambda: screen_frames(frames), repeat, units=len(frames)))
+
+    payload = fixtures.option_chain_payload("NIFTY")
+    results.append(bench("chain_parse", lambda: OptionChain.from_payload(payload), repeat))
+    chain = OptionChain.from_payload(payload).for_expiry(expiry)
+    results.append(bench("chain_pricing", lambda: PricedChain(chain, fixtures.INDEX_SPOTS["NIFTY"], expiry),
+                         repeat, units=len(chain)))
+    results.append(bench("oi_and_pricing_per_symbol", lambda: [
+        build_stock_signal(s, "BUY", frames[s], "Safe", "ATM", expiry) for s in universe], repeat, units=len(universe)))
+
+    history = {s: fixtures.ohlc_frame(s + ".NS") for s in universe[:20]}
+    bars = sum(len(df) for df in history.values())
+    results.append(bench("backtest_60d", lambda: run_backtest_universe(history, rules="stock"), 1, units=bars))
+    return results
+
+# ---------------------- Regression Check ----------------------
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base and r["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(f"{r['name']}: {base['seconds']}s -> {r['seconds']}s")
+    for line in regressions:
+        print("REGRESSION", line)
+    return not regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline signal pipeline benchmarks")
+    parser.add_argument("--symbols", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        install_offline_sources(store_dir)
+        metrics.reset()
+        results = run_suite(args.symbols, args.repeat)
+
+    snapshot = metrics.snapshot()
+    print(json.dumps(snapshot["counters"], indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "metrics": snapshot}, f, indent=2)
+    if args.baseline and not compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import copy
+import math
+import threading
+
+RSI_WINDOW = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGN = 9
+
+# ---------------------- Incremental Indicator State ----------------------
+class IndicatorState:
+    # Running Wilder RSI averages, MACD EMAs and VWAP sums; each bar costs O(1).
+    # Values match ta's RSIIndicator/MACD and the cumulative VWAP over the same bars.
+    __slots__ = ("count", "prev_close", "avg_gain", "avg_loss", "ema_fast", "ema_slow",
+                 "ema_signal", "macd_count", "pv_sum", "v_sum", "last_time")
+
+    def __init__(self):
+        self.count = 0
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.ema_fast = None
+        self.ema_slow = None
+        self.ema_signal = None
+        self.macd_count = 0
+        self.pv_sum = 0.0
+        self.v_sum = 0.0
+        self.last_time = None
+
+    def update(self, high, low, close, volume, timestamp=None):
+        # ta treats the first bar's missing diff as a zero move, so RSI averages start at bar 0
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        gain, loss = max(diff, 0.0), max(-diff, 0.0)
+        if self.count == 0:
+            self.avg_gain, self.avg_loss = gain, loss
+            self.ema_fast = self.ema_slow = close
+        else:
+            a = 1.0 / RSI_WINDOW
+            self.avg_gain += a * (gain - self.avg_gain)
+            self.avg_loss += a * (loss - self.avg_loss)
+            self.ema_fast += 2.0 / (MACD_FAST + 1) * (close - self.ema_fast)
+            self.ema_slow += 2.0 / (MACD_SLOW + 1) * (close - self.ema_slow)
+        self.count += 1
+        self.prev_close = close
+
+        if self.count >= MACD_SLOW:
+            macd = self.ema_fast - self.ema_slow
+            if self.ema_signal is None:
+                self.ema_signal = macd
+            else:
+                self.ema_signal += 2.0 / (MACD_SIGN + 1) * (macd - self.ema_signal)
+            self.macd_count += 1
+
+        self.pv_sum += volume * (high + low + close) / 3
+        self.v_sum += volume
+        self.last_time = timestamp
+        return self.values(close)
+
+    def peek(self, high, low, close, volume, timestamp=None):
+        # Values as if the bar were appended, without committing it (for the still-forming bar)
+        return copy.copy(self).update(high, low, close, volume, timestamp)
+
+    def values(self, close=None):
+        nan = math.nan
+        if self.count >= RSI_WINDOW:
+            rsi = 100.0 if self.avg_loss == 0 else 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        else:
+            rsi = nan
+        macd = self.ema_fast - self.ema_slow if self.count >= MACD_SLOW else nan
+        macd_signal = self.ema_signal if self.macd_count >= MACD_SIGN else nan
+        vwap = self.pv_sum / self.v_sum if self.v_sum else nan
+        return {
+            "Close": self.prev_close if close is None else close,
+            "RSI": rsi,
+            "MACD": macd,
+            "MACD_signal": macd_signal,
+            "VWAP": vwap,
+        }
+
+# ---------------------- Per-Symbol Streaming Cache ----------------------
+_states = {}
+_states_lock = threading.Lock()
+
+def _bars(df, start):
+    cols = [df[c].to_numpy(dtype=float)[start:] for c in ("High", "Low", "Close", "Volume")]
+    return zip(df.index[start:], *cols)
+
+def latest_indicators(key, df):
+    # Feed only the bars appended since the last call. The final bar may still be forming,
+    # so it is peeked rather than committed and gets re-read on the next refresh.
+    if df.empty:
+        return None
+    with _states_lock:
+        entry = _states.get(key)
+
+    first_time = df.index[0]
+    start = 0
+    if entry is not None:
+        seed_time, state = entry
+        pos = df.index.searchsorted(state.last_time, side="right") if state.last_time is not None else 0
+        # Same window start and the last committed bar still present: resume from it
+        if seed_time == first_time and pos > 0 and df.index[pos - 1] == state.last_time:
+            state = copy.copy(state)
+            start = pos
+        else:
+            state = IndicatorState()
+    else:
+        state = IndicatorState()
+
+    last = len(df) - 1
+    if start > last:
+        # No new bars; the final bar was committed by an earlier, longer frame
+        return state.values()
+    for timestamp, high, low, close, volume in _bars(df.iloc[:last], start):
+        state.update(high, low, close, volume, timestamp)
+
+    with _states_lock:
+        _states[key] = (first_time, state)
+
+    high, low, close, volume = (float(df[c].iloc[-1]) for c in ("High", "Low", "Close", "Volume"))
+    return state.peek(high, low, close, volume, df.index[-1])
+
+def reset_indicators(key=None):
+    with _states_lock:
+        if key is None:
+            _states.clear()
+        else:
+            _states.pop(key, None)
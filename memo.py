@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+MB = 1024 * 1024
+FRAME_CACHE_BYTES = int(os.environ.get("MEMO_FRAME_MB", 128)) * MB
+LEVEL_CACHE_BYTES = int(os.environ.get("MEMO_LEVEL_MB", 64)) * MB
+ROW_CACHE_BYTES = int(os.environ.get("MEMO_ROW_MB", 16)) * MB
+
+_MISSING = object()
+
+# ---------------------- Size Estimate ----------------------
+def sizeof(value, depth=0):
+    # Bytes held by a cached value: frames and arrays by their buffers, containers and
+    # plain objects by walking a few levels down
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if depth >= 4:
+        return size
+    if isinstance(value, dict):
+        return size + sum(sizeof(v, depth + 1) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return size + sum(sizeof(v, depth + 1) for v in value)
+    if hasattr(value, "__dict__"):
+        return size + sizeof(vars(value), depth + 1)
+    return size
+
+# ---------------------- LRU Cache ----------------------
+class LRUCache:
+    # Least-recently-used entries are evicted once the estimated size passes max_bytes
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                metrics.incr(f"memo.{self.name}.miss")
+                return default
+            self._entries.move_to_end(key)
+        metrics.incr(f"memo.{self.name}.hit")
+        return entry[0]
+
+    def put(self, key, value):
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                metrics.incr(f"memo.{self.name}.evicted")
+        return value
+
+    def get_or_compute(self, key, fn, *args):
+        if key is None:
+            # Nothing identifies the inputs (see chain_key); compute without caching
+            return fn(*args)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, fn(*args))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "mb": round(self.bytes / MB, 2), "max_mb": self.max_bytes // MB}
+
+# Indicator frames and screen verdicts / chain-derived OI levels and pricing / final signal rows.
+# Split so a sidebar change that only touches the rows re-derives them from the lower layers.
+frames = LRUCache("frames", FRAME_CACHE_BYTES)
+levels = LRUCache("levels", LEVEL_CACHE_BYTES)
+rows = LRUCache("rows", ROW_CACHE_BYTES)
+CACHES = [frames, levels, rows]
+
+def bar_key(df):
+    # Identifies a bar series by its last bar: a new bar, or a refreshed forming bar, changes it
+    if df.empty:
+        return (0,)
+    last = df.iloc[-1]
+    return (len(df), df.index[-1], float(last["Close"]), float(last["Volume"]))
+
+def chain_key(chain, *parts):
+    # Key for values derived from an option chain: its data identity, never the object, so
+    # an entry does not pin the chain's arrays. None (uncached) if the chain has no identity.
+    return None if chain.key is None else (*parts, chain.key)
+
+def stats():
+    return {cache.name: cache.stats() for cache in CACHES}
+
+def clear():
+    for cache in CACHES:
+        cache.clear()
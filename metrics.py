@@ -0,0 +1,62 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+
+# ---------------------- Stage Timers & Counters ----------------------
+def record(name, seconds):
+    with _lock:
+        stat = _timers.get(name)
+        if stat is None:
+            _timers[name] = [1, seconds, seconds, seconds]
+        else:
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+            stat[3] = seconds
+
+@contextmanager
+def timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def timed(name):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+# ---------------------- Snapshot ----------------------
+def snapshot():
+    with _lock:
+        timers = {
+            name: {
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total / calls * 1000, 3),
+                "max_ms": round(peak * 1000, 3),
+                "last_ms": round(last * 1000, 3),
+            }
+            for name, (calls, total, peak, last) in sorted(_timers.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"timers": timers, "counters": counters}
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
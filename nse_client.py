@@ -0,0 +1,123 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+import time
+
+import metrics
+
+NSE_BASE_URL = os.environ.get("NSE_BASE_URL", "https://www.nseindia.com")   # or a replay server
+HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": NSE_BASE_URL + "/option-chain",
+}
+REQUEST_TIMEOUT = 10
+COOKIE_MAX_AGE = 300       # seconds, used when NSE cookies carry no expiry
+OPTION_CHAIN_TTL = 60      # seconds an option-chain payload is served from cache
+FO_LIST_TTL = 6 * 60 * 60  # the F&O universe changes rarely
+
+_session = None
+_cookie_expiry = 0.0
+_session_lock = threading.Lock()
+
+_cache = {}
+_cache_lock = threading.Lock()
+_key_locks = {}
+
+# ---------------------- Pooled Session ----------------------
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+def _refresh_cookies(session):
+    global _cookie_expiry
+    session.cookies.clear()
+    session.get(NSE_BASE_URL, timeout=REQUEST_TIMEOUT)
+    expiry = time.time() + COOKIE_MAX_AGE
+    for cookie in session.cookies:
+        if cookie.expires:
+            expiry = min(expiry, cookie.expires)
+    _cookie_expiry = expiry
+
+def _ensure_cookies(session, force=False):
+    with _session_lock:
+        if force or time.time() >= _cookie_expiry:
+            metrics.incr("nse.cookie_refresh")
+            _refresh_cookies(session)
+
+def reset_session():
+    global _session, _cookie_expiry
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _cookie_expiry = 0.0
+
+# ---------------------- Requests with Retry ----------------------
+def get_json(path, retries=3, backoff=0.5):
+    session = get_session()
+    last_error = None
+    for attempt in range(retries):
+        try:
+            _ensure_cookies(session, force=attempt > 0)
+            with metrics.timer("nse.fetch"):
+                response = session.get(NSE_BASE_URL + path, timeout=REQUEST_TIMEOUT)
+            if response.status_code in (401, 403):
+                # Cookies were rejected early; refresh them on the next attempt
+                raise requests.HTTPError(f"NSE rejected session: {response.status_code}")
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            last_error = e
+            metrics.incr("nse.errors")
+            if attempt < retries - 1:
+                time.sleep(backoff * (2 ** attempt))
+    raise last_error
+
+# ---------------------- TTL Cache ----------------------
+def _key_lock(key):
+    with _cache_lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+def cached_json(path, ttl, key=None):
+    key = key or path
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and hit[0] > time.time():
+        metrics.incr("nse.cache_hit")
+        return hit[1]
+
+    # One fetch per key at a time; concurrent callers wait and reuse its payload
+    with _key_lock(key):
+        with _cache_lock:
+            hit = _cache.get(key)
+        if hit and hit[0] > time.time():
+            metrics.incr("nse.cache_hit")
+            return hit[1]
+        metrics.incr("nse.cache_miss")
+        payload = get_json(path)
+        with _cache_lock:
+            _cache[key] = (time.time() + ttl, payload)
+        return payload
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+# ---------------------- NSE Endpoints ----------------------
+def get_option_chain(symbol, kind="indices", ttl=OPTION_CHAIN_TTL):
+    path = f"/api/option-chain-{kind}?symbol={symbol}"
+    return cached_json(path, ttl, key=("option-chain", kind, symbol))
+
+def get_fo_stock_payload(ttl=FO_LIST_TTL):
+    return cached_json("/api/liveEquity-derivatives", ttl)
@@ -0,0 +1,243 @@
+import itertools
+import threading
+from datetime import datetime
+
+import numpy as np
+
+import metrics
+import nse_client
+
+FIELDS = {
+    "ltp": "lastPrice",
+    "oi": "openInterest",
+    "iv": "impliedVolatility",
+    "volume": "totalTradedVolume",
+}
+
+NO_EXPIRY = np.datetime64("NaT", "D")
+
+def _parse_expiries(records):
+    # A payload has a handful of distinct expiry strings ("28-Nov-2024"); parse each once
+    parsed = {}
+    for r in records:
+        raw = r.get("expiryDate")
+        if raw not in parsed:
+            try:
+                parsed[raw] = np.datetime64(datetime.strptime(raw, "%d-%b-%Y").date(), "D")
+            except (TypeError, ValueError):
+                parsed[raw] = NO_EXPIRY
+    return np.array([parsed[r.get("expiryDate")] for r in records], dtype="datetime64[D]")
+
+def _strike_value(strike):
+    strike = float(strike)
+    return int(strike) if strike.is_integer() else strike
+
+# ---------------------- Columnar Option Chain ----------------------
+class OptionChain:
+    # One NSE option-chain payload as parallel arrays sorted by (expiry, strike), so each
+    # expiry is a contiguous block. CE/PE values live in ce[field] / pe[field]; missing
+    # quotes are NaN (OI and volume are 0). Strike lookups need a single-expiry chain,
+    # which for_expiry() returns as views into these arrays (or copies, with copy=True).
+    # `key` names the data a chain holds, for caches of values derived from it; chains
+    # built outside get_chain have none and are not cached.
+    def __init__(self, strikes, ce, pe, expiries=None, key=None):
+        self.strikes = strikes
+        self.ce = ce
+        self.pe = pe
+        self.expiries = expiries if expiries is not None else np.full(len(strikes), NO_EXPIRY)
+        self.key = key
+        # Compare as integers so rows without an expiry (NaT) form one block
+        codes = self.expiries.view("i8")
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(strikes) else np.empty(0, int)
+        self._block_starts = starts
+        self._block_expiries = self.expiries[starts]
+
+    @classmethod
+    def empty(cls):
+        blank = {name: np.empty(0) for name in FIELDS}
+        return cls(np.empty(0), blank, dict(blank), np.empty(0, dtype="datetime64[D]"), key=("empty",))
+
+    @classmethod
+    def from_payload(cls, data):
+        records = data["records"]["data"]
+        n = len(records)
+        strikes = np.fromiter((r.get("strikePrice", np.nan) for r in records), dtype=float, count=n)
+        sides = {}
+        for side in ("CE", "PE"):
+            legs = [r.get(side) or {} for r in records]
+            sides[side] = {
+                name: np.fromiter(
+                    (np.nan if leg.get(key) is None else leg[key] for leg in legs), dtype=float, count=n
+                )
+                for name, key in FIELDS.items()
+            }
+            # Absent legs carry no open interest or volume, as the old per-record parse assumed
+            for name in ("oi", "volume"):
+                np.nan_to_num(sides[side][name], copy=False, nan=0.0)
+
+        expiries = _parse_expiries(records)
+        order = np.lexsort((strikes, expiries))
+        ce = {name: values[order] for name, values in sides["CE"].items()}
+        pe = {name: values[order] for name, values in sides["PE"].items()}
+        return cls(strikes[order], ce, pe, expiries[order])
+
+    @property
+    def expiry_dates(self):
+        return [e.astype(object) for e in self._block_expiries if not np.isnat(e)]
+
+    @property
+    def expiry(self):
+        # The contract date of a single-expiry chain, else None
+        if len(self._block_expiries) != 1 or np.isnat(self._block_expiries[0]):
+            return None
+        return self._block_expiries[0].astype(object)
+
+    def resolve_expiry(self, expiry_date):
+        # Exact contract if listed, otherwise the first one after the requested date
+        blocks = self._block_expiries
+        if not len(blocks):
+            return None
+        target = np.datetime64(expiry_date, "D")
+        i = int(np.searchsorted(blocks, target))
+        return min(i, len(blocks) - 1)
+
+    def for_expiry(self, expiry_date=None, copy=False):
+        if len(self._block_starts) <= 1:
+            return self
+        block = self.resolve_expiry(expiry_date) if expiry_date is not None else 0
+        bounds = np.r_[self._block_starts, len(self.strikes)]
+        part = slice(bounds[block], bounds[block + 1])
+        take = (lambda values: values[part].copy()) if copy else (lambda values: values[part])
+        key = None if self.key is None else (*self.key, self._block_expiries[block].astype(object))
+        return OptionChain(
+            take(self.strikes),
+            {name: take(values) for name, values in self.ce.items()},
+            {name: take(values) for name, values in self.pe.items()},
+            take(self.expiries),
+            key=key,
+        )
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def side(self, option_type):
+        return self.ce if option_type == "CE" else self.pe
+
+    def _position(self, strike):
+        # Binary search; with repeated strikes the last record wins, as the old dict did
+        i = np.searchsorted(self.strikes, strike, side="right") - 1
+        return i if i >= 0 and self.strikes[i] == strike else None
+
+    def ltp(self, strike, option_type, default=None):
+        i = self._position(strike)
+        if i is None:
+            return default
+        value = self.side(option_type)["ltp"][i]
+        return default if np.isnan(value) else float(value)
+
+    def max_oi(self, option_type):
+        oi = self.side(option_type)["oi"]
+        if not len(oi):
+            return None, None
+        i = int(np.argmax(oi))
+        return _strike_value(self.strikes[i]), float(oi[i])
+
+    def cheapest(self, option_type, low=5, high=np.inf):
+        # Strike with the lowest premium strictly inside (low, high)
+        ltp = self.side(option_type)["ltp"]
+        candidates = np.where((ltp > low) & (ltp < high), ltp, np.inf)
+        if not len(candidates) or np.isinf(candidates.min()):
+            return None
+        return _strike_value(self.strikes[int(np.argmin(candidates))])
+
+    def nearest_strike(self, price):
+        if not len(self.strikes):
+            return None
+        i = np.searchsorted(self.strikes, price)
+        lo, hi = max(i - 1, 0), min(i, len(self.strikes) - 1)
+        best = lo if abs(price - self.strikes[lo]) <= abs(self.strikes[hi] - price) else hi
+        return _strike_value(self.strikes[best])
+
+    def oi_levels(self):
+        support, support_oi = self.max_oi("PE")
+        resistance, resistance_oi = self.max_oi("CE")
+        return {
+            "support_strike": support,
+            "resistance_strike": resistance,
+            "support_oi": support_oi,
+            "resistance_oi": resistance_oi,
+            "expiry": self.expiry,
+        }
+
+    def _block_argmax(self, values):
+        # Per-expiry argmax in one pass: block maxima via reduceat, then the first row hitting it
+        starts = self._block_starts
+        block_max = np.maximum.reduceat(values, starts)
+        sizes = np.diff(np.r_[starts, len(values)])
+        rows = np.arange(len(values))
+        hits = np.where(values == np.repeat(block_max, sizes), rows, len(values))
+        return np.minimum.reduceat(hits, starts), block_max
+
+    def oi_levels_by_expiry(self):
+        if not len(self.strikes):
+            return {}
+        pe_rows, pe_max = self._block_argmax(self.pe["oi"])
+        ce_rows, ce_max = self._block_argmax(self.ce["oi"])
+        levels = {}
+        for k, expiry in enumerate(self._block_expiries):
+            key = None if np.isnat(expiry) else expiry.astype(object)
+            levels[key] = {
+                "support_strike": _strike_value(self.strikes[pe_rows[k]]),
+                "resistance_strike": _strike_value(self.strikes[ce_rows[k]]),
+                "support_oi": float(pe_max[k]),
+                "resistance_oi": float(ce_max[k]),
+                "expiry": key,
+            }
+        return levels
+
+# ---------------------- Parsed Chain Cache ----------------------
+# nse_client hands back the same payload object while its TTL holds,
+# so the parse runs once per fetch rather than once per caller. Every expiry's
+# OI levels are worked out in the same pass and shared by that payload's views.
+_parsed = {}
+_parsed_lock = threading.Lock()
+_generation = itertools.count()
+
+def get_chain(symbol, kind="indices", expiry_date=None):
+    # Full multi-expiry chain, or the block for expiry_date when one is given
+    payload = nse_client.get_option_chain(symbol, kind)
+    key = (kind, symbol)
+    with _parsed_lock:
+        hit = _parsed.get(key)
+    if hit and hit[0] is payload:
+        chain, views = hit[1], hit[2]
+    else:
+        with metrics.timer("chain.parse"):
+            chain = OptionChain.from_payload(payload)
+            levels = chain.oi_levels_by_expiry()
+        chain.key = (kind, symbol, next(_generation))
+        views = {}
+        with _parsed_lock:
+            _parsed[key] = (payload, chain, views, levels)
+    if expiry_date is None:
+        return chain
+    # The same block comes back until the payload refreshes. It is a copy, so memoized values
+    # derived from it hold only this contract's arrays, not the whole payload's.
+    with _parsed_lock:
+        view = views.get(expiry_date)
+        if view is None:
+            view = views[expiry_date] = chain.for_expiry(expiry_date, copy=True)
+    return view
+
+def oi_levels_for(chain):
+    # OI levels of a chain from get_chain, read from its payload's per-expiry table; a full
+    # chain gets its nearest contract's, as for_expiry() does. Other chains compute their own.
+    key = chain.key
+    if key is not None and len(key) >= 3:
+        with _parsed_lock:
+            hit = _parsed.get(key[:2])
+        if hit is not None and hit[1].key == key[:3] and hit[3]:
+            levels = hit[3].get(key[3]) if len(key) > 3 else next(iter(hit[3].values()))
+            if levels is not None:
+                return levels
+    return chain.oi_levels()
@@ -0,0 +1,112 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+BAR_COLUMNS = ["High", "Low", "Close", "Volume"]
+SHARDS_PER_WORKER = 2
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# ---------------------- Process Pool ----------------------
+def get_pool(max_workers=None):
+    # One long-lived pool: spawned workers pay the pandas/ta import once, not per scan.
+    # "spawn" keeps workers clear of the Streamlit and scanner threads a fork would copy.
+    global _pool, _pool_workers
+    max_workers = max_workers or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context("spawn"))
+            _pool_workers = max_workers
+        return _pool
+
+def _discard_pool(pool):
+    # A worker died and the executor refuses new work; the next get_pool() builds a fresh one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+atexit.register(shutdown_pool)
+
+# ---------------------- Shared Bar Arrays ----------------------
+def pack_frames(frames):
+    # Copy every symbol's bars once into one shared (rows, 4) float64 block; workers get
+    # only the block name and (symbol, start, stop) offsets instead of pickled DataFrames.
+    layout, total = [], 0
+    for symbol, df in frames.items():
+        layout.append((symbol, total, total + len(df)))
+        total += len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * len(BAR_COLUMNS) * 8)
+    block = np.ndarray((total, len(BAR_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+    for (symbol, start, stop) in layout:
+        block[start:stop] = frames[symbol][BAR_COLUMNS].to_numpy(dtype=np.float64)
+    return shm, total, layout
+
+def _shards(layout, count):
+    # Greedy split into `count` shards of roughly equal bar counts
+    shards = [[] for _ in range(count)]
+    loads = [0] * count
+    for entry in sorted(layout, key=lambda e: e[2] - e[1], reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(entry)
+        loads[i] += entry[2] - entry[1]
+    return [s for s in shards if s]
+
+def _screen_shard(shm_name, total, shard):
+    # Runs in a worker process: attach to the block and screen each symbol's view of it
+    from stock_engine import screen_stock
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray((total, len(BAR_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+    try:
+        # Each frame copies its own slice so no view outlives the close() below
+        return [(symbol, screen_stock(pd.DataFrame(block[start:stop], columns=BAR_COLUMNS, copy=True)))
+                for symbol, start, stop in shard]
+    finally:
+        del block
+        shm.close()
+
+# ---------------------- Screening ----------------------
+def screen_frames(frames, max_workers=None):
+    # {symbol: (verdict, indicators)} for every frame, computed across the process pool
+    frames = {s: df for s, df in frames.items() if not df.empty}
+    if not frames:
+        return {}
+    pool = get_pool(max_workers)
+    with metrics.timer("screen.process_pool"):
+        shm, total, layout = pack_frames(frames)
+        try:
+            futures = [pool.submit(_screen_shard, shm.name, total, shard)
+                       for shard in _shards(layout, _pool_workers * SHARDS_PER_WORKER)]
+            results = {}
+            for future in futures:
+                results.update(future.result())
+        except BrokenProcessPool:
+            metrics.incr("screen.pool_broken")
+            _discard_pool(pool)
+            raise
+        finally:
+            shm.close()
+            shm.unlink()
+    metrics.incr("symbols.screened", len(results))
+    return results
@@ -0,0 +1,179 @@
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+import memo
+import metrics
+
+RISK_FREE_RATE = 0.065
+MARKET_TZ = ZoneInfo("Asia/Kolkata")
+EXPIRY_CLOSE = dtime(15, 30)
+YEAR_SECONDS = 365 * 24 * 60 * 60
+MIN_T = 1 / (365 * 24)            # an hour; keeps expiry-day maths finite
+BARS_PER_YEAR = 75 * 252          # 5-minute bars in an NSE trading year
+HORIZON_DAYS = 1                  # targets/stops are sized for a one-day move
+STOP_MOVE = 0.5                   # adverse move for the stop, as a fraction of the expected move
+MIN_PREMIUM = 0.05                # NSE tick
+IV_BOUNDS = (1e-4, 5.0)
+
+# ---------------------- Normal Distribution ----------------------
+def _erf(x):
+    # Abramowitz & Stegun 7.1.26 (|error| < 1.5e-7), vectorized without SciPy
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+def norm_cdf(x):
+    return 0.5 * (1.0 + _erf(np.asarray(x, dtype=float) / np.sqrt(2.0)))
+
+def norm_pdf(x):
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2.0 * np.pi)
+
+# ---------------------- Black-Scholes ----------------------
+def _d1_d2(spot, strike, t, vol, r):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (r + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t
+
+def bs_price(spot, strike, t, vol, is_call, r=RISK_FREE_RATE):
+    d1, d2 = _d1_d2(spot, strike, t, vol, r)
+    discount = strike * np.exp(-r * t)
+    call = spot * norm_cdf(d1) - discount * norm_cdf(d2)
+    put = discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+def bs_greeks(spot, strike, t, vol, is_call, r=RISK_FREE_RATE):
+    # Theta per calendar day, vega per 1 volatility point
+    d1, d2 = _d1_d2(spot, strike, t, vol, r)
+    pdf = norm_pdf(d1)
+    sqrt_t = np.sqrt(t)
+    discount = strike * np.exp(-r * t)
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0)
+    gamma = pdf / (spot * vol * sqrt_t)
+    decay = -spot * pdf * vol / (2.0 * sqrt_t)
+    theta = np.where(is_call, decay - r * discount * norm_cdf(d2), decay + r * discount * norm_cdf(-d2)) / 365
+    vega = spot * pdf * sqrt_t / 100
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
+
+def implied_vol(price, spot, strike, t, is_call, r=RISK_FREE_RATE, tol=1e-6, max_iter=50):
+    # Newton iteration on every strike at once, kept inside a shrinking bisection bracket
+    # so deep ITM/OTM strikes with tiny vega still converge. NaN where no vol fits the price.
+    price, strike = np.broadcast_arrays(np.asarray(price, dtype=float), np.asarray(strike, dtype=float))
+    is_call = np.broadcast_to(is_call, price.shape)
+    lo = np.full(price.shape, IV_BOUNDS[0])
+    hi = np.full(price.shape, IV_BOUNDS[1])
+    vol = np.full(price.shape, 0.3)
+    intrinsic = np.where(is_call, np.maximum(spot - strike * np.exp(-r * t), 0),
+                         np.maximum(strike * np.exp(-r * t) - spot, 0))
+    valid = np.isfinite(price) & (price > intrinsic) & (price < np.where(is_call, spot, strike))
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        diff = bs_price(spot, strike, t, vol, is_call, r) - price
+        lo = np.where(diff < 0, vol, lo)
+        hi = np.where(diff > 0, vol, hi)
+        vega = bs_greeks(spot, strike, t, vol, is_call, r)["vega"] * 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = vol - diff / vega
+        step = np.where((step > lo) & (step < hi) & np.isfinite(step), step, 0.5 * (lo + hi))
+        active &= np.abs(diff) > tol
+        vol = np.where(active, step, vol)
+
+    return np.where(valid, vol, np.nan)
+
+def time_to_expiry(expiry_date, now=None):
+    now = now or datetime.now(MARKET_TZ)
+    expiry = datetime.combine(expiry_date, EXPIRY_CLOSE, tzinfo=MARKET_TZ)
+    return max((expiry - now).total_seconds() / YEAR_SECONDS, MIN_T)
+
+def historical_vol(close):
+    # Annualised volatility from 5-minute closes, used when the chain has no usable IV
+    returns = np.diff(np.log(np.asarray(close, dtype=float)))
+    returns = returns[np.isfinite(returns)]
+    return float(returns.std() * np.sqrt(BARS_PER_YEAR)) if len(returns) > 1 else np.nan
+
+def option_levels(spot, strike, t, vol, is_call, entry=None, r=RISK_FREE_RATE, horizon_days=HORIZON_DAYS):
+    # Reprice after a one-sigma favourable move (target) and half that adverse move (stop) over
+    # the horizon, and apply the model's change to the entry so market premiums stay anchored.
+    model = bs_price(spot, strike, t, vol, is_call, r)
+    entry = model if entry is None else np.where(np.isfinite(entry), entry, model)
+    entry = np.maximum(entry, MIN_PREMIUM)
+    h = horizon_days / 365
+    later = np.maximum(t - h, MIN_T)
+    move = spot * vol * np.sqrt(h)
+    direction = np.where(is_call, 1.0, -1.0)
+    up = bs_price(spot + direction * move, strike, later, vol, is_call, r)
+    down = bs_price(spot - direction * STOP_MOVE * move, strike, later, vol, is_call, r)
+    target = np.maximum(entry + (up - model), entry + MIN_PREMIUM)
+    # A tick-priced entry has no room below it; the stop then sits on the tick, not under it
+    stop = np.maximum(np.minimum(entry + (down - model), entry - MIN_PREMIUM), MIN_PREMIUM)
+    return entry, target, stop
+
+# ---------------------- Chain Pricing ----------------------
+class PricedChain:
+    # IV, greeks and entry/target/stop for every strike of a single-expiry chain in one pass
+    @metrics.timed("pricing.chain")
+    def __init__(self, chain, spot, expiry_date, fallback_vol=np.nan, r=RISK_FREE_RATE, now=None):
+        self.chain = chain
+        self.spot = spot
+        self.r = r
+        self.t = time_to_expiry(chain.expiry or expiry_date, now)
+        strikes = chain.strikes
+        self.sides = {}
+        solved = {}
+        for option_type in ("CE", "PE"):
+            side = chain.side(option_type)
+            iv = implied_vol(side["ltp"], spot, strikes, self.t, option_type == "CE", r)
+            # NSE quotes IV in percent; use it where the LTP did not pin one down
+            solved[option_type] = np.where(np.isfinite(iv), iv, side["iv"] / 100)
+        self.atm_vol = self._atm_vol(solved, fallback_vol)
+
+        for option_type, iv in solved.items():
+            is_call = option_type == "CE"
+            iv = np.where(np.isfinite(iv) & (iv > 0), iv, self.atm_vol)
+            entry, target, stop = option_levels(spot, strikes, self.t, iv, is_call,
+                                                entry=chain.side(option_type)["ltp"], r=r)
+            self.sides[option_type] = {
+                "iv": iv,
+                "model": bs_price(spot, strikes, self.t, iv, is_call, r),
+                "entry": entry,
+                "target": target,
+                "stop": stop,
+                **bs_greeks(spot, strikes, self.t, iv, is_call, r),
+            }
+
+    def _atm_vol(self, solved, fallback_vol):
+        if len(self.chain):
+            nearest = self.chain.nearest_strike(self.spot)
+            near = np.abs(self.chain.strikes - nearest) <= 1e-9
+            vols = np.concatenate([solved["CE"][near], solved["PE"][near]])
+            vols = vols[np.isfinite(vols) & (vols > 0)]
+            if len(vols):
+                return float(np.median(vols))
+        return fallback_vol
+
+    def levels(self, strike, option_type):
+        # (entry, target, stop) rounded to paise, or None if the strike cannot be priced or
+        # trades at the tick; strikes outside the chain use the ATM vol
+        i = self.chain._position(strike) if strike is not None and len(self.chain) else None
+        if i is not None:
+            side = self.sides[option_type]
+            values = (side["entry"][i], side["target"][i], side["stop"][i])
+        elif strike is not None and np.isfinite(self.atm_vol):
+            values = option_levels(self.spot, strike, self.t, self.atm_vol, option_type == "CE", r=self.r)
+        else:
+            return None
+        if values[0] <= MIN_PREMIUM:
+            # A tick-priced contract has no room for a stop below the entry; not a tradable signal
+            return None
+        return tuple(round(float(v), 2) for v in values)
+
+def priced_chain(chain, spot, expiry_date, fallback_vol=np.nan):
+    # PricedChain shared across strategies and strike types while the chain and spot hold
+    key = memo.chain_key(chain, "priced", spot, expiry_date, fallback_vol)
+    return memo.levels.get_or_compute(key, PricedChain, chain, spot, expiry_date, fallback_vol)
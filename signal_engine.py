@@ -1,77 +1,64 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from ta.momentum import RSIIndicator
 from ta.trend import MACD
-import requests
 from datetime import datetime, timedelta
 
+import bar_store
+import memo
+import metrics
+import timeframes
+from option_chain import OptionChain, get_chain, oi_levels_for
+from pricing import historical_vol, priced_chain
+
 # ---------------------- OI + LTP SCRAPER ----------------------
-def get_oi_levels(index="NIFTY"):
-    headers = {"User-Agent": "Mozilla/5.0"}
+def get_index_chain(index="NIFTY", expiry_date=None):
     try:
-        session = requests.Session()
-        session.get("https://www.nseindia.com", headers=headers)
-        url = f"https://www.nseindia.com/api/option-chain-indices?symbol={index}"
-        response = session.get(url, headers=headers)
-        data = response.json()
-        strike_data = []
-        for record in data["records"]["data"]:
-            strike = record.get("strikePrice")
-            ce = record.get("CE", {})
-            pe = record.get("PE", {})
-            ce_oi = ce.get("openInterest", 0)
-            pe_oi = pe.get("openInterest", 0)
-            strike_data.append({"strike": strike, "CE_OI": ce_oi, "PE_OI": pe_oi})
-        df = pd.DataFrame(strike_data)
-        max_pe = df.loc[df["PE_OI"].idxmax()]
-        max_ce = df.loc[df["CE_OI"].idxmax()]
-        return {
-            "support_strike": int(max_pe["strike"]),
-            "resistance_strike": int(max_ce["strike"])
-        }
+        return get_chain(index, "indices", expiry_date)
     except Exception as e:
-        print("OI Error:", e)
-        return {"support_strike": None, "resistance_strike": None}
+        print("Option Chain Error:", e)
+        return OptionChain.empty()
 
-def get_option_chain_ltp(index="NIFTY"):
-    url = f"https://www.nseindia.com/api/option-chain-indices?symbol={index}"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        session = requests.Session()
-        session.get("https://www.nseindia.com", headers=headers)
-        response = session.get(url, headers=headers)
-        data = response.json()
-        strike_prices = {}
-        for record in data["records"]["data"]:
-            strike = record.get("strikePrice")
-            ce_ltp = record.get("CE", {}).get("lastPrice")
-            pe_ltp = record.get("PE", {}).get("lastPrice")
-            strike_prices[strike] = {"CE": ce_ltp, "PE": pe_ltp}
-        return strike_prices
-    except Exception as e:
-        print("LTP Fetch Error:", e)
-        return {}
+def get_oi_levels(index="NIFTY", expiry_date=None):
+    levels = oi_levels_for(get_index_chain(index, expiry_date))
+    return {"support_strike": levels.get("support_strike"), "resistance_strike": levels.get("resistance_strike")}
 
 # ---------------------- UTILITY ----------------------
 def get_symbol(index):
     return {"NIFTY": "^NSEI", "BANKNIFTY": "^NSEBANK", "SENSEX": "^BSESN"}.get(index, "^NSEI")
 
-def fetch_data(symbol):
-    df = yf.download(symbol, period="5d", interval="5m", progress=False, auto_adjust=True)
-    df.dropna(inplace=True)
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    return df if not df.empty else pd.DataFrame()
+def fetch_data(symbol, days=timeframes.BASE_SESSIONS):
+    try:
+        with metrics.timer("fetch.index_bars"):
+            return bar_store.get_bars(symbol, days=days)
+    except Exception as e:
+        print("Data Fetch Error:", e)
+        return pd.DataFrame()
 
-def calculate_indicators(df):
+def add_momentum(df):
     df["RSI"] = RSIIndicator(close=df["Close"]).rsi()
     macd = MACD(close=df["Close"])
     df["MACD"] = macd.macd()
     df["MACD_signal"] = macd.macd_signal()
+    return df
+
+@metrics.timed("indicators.full")
+def calculate_indicators(df):
+    metrics.incr("bars.processed", len(df))
+    # Own the bars: store frames are views over memory-mapped files, and the result is memoized
+    df = add_momentum(df.copy())
     df["VWAP"] = (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
     return df
 
+@metrics.timed("indicators.timeframe")
+def timeframe_indicators(df, rule, history=None):
+    # calculate_indicators output resampled to `rule`. RSI/MACD depend on the bar size and are
+    # recomputed on the shorter series, from `history` (more sessions of the same base bars)
+    # when given so they have enough bars to warm up; VWAP is cumulative, so the base value
+    # is carried over.
+    bars = df if history is None else history.assign(VWAP=df["VWAP"].reindex(history.index))
+    return add_momentum(timeframes.resample_bars(bars, rule, carry=["VWAP"]))
+
 def premium_band(entry):
     if entry <= 50:
         return "₹0–50"
@@ -80,80 +67,132 @@ def premium_band(entry):
     else:
         return "₹151+"
 
+# ---------------------- VECTORIZED STRATEGY ENGINE ----------------------
+STRATEGIES = ["Safe", "Min Investment", "Max Profit", "Reversal", "Breakout"]
+
+STRATEGY_REASONS = {
+    ("Safe", "BUY"): "OI Support/Resistance",
+    ("Safe", "SELL"): "OI Support/Resistance",
+    ("Min Investment", "BUY"): "Lowest Premium",
+    ("Min Investment", "SELL"): "Lowest Premium",
+    ("Max Profit", "BUY"): "Momentum",
+    ("Max Profit", "SELL"): "Momentum",
+    ("Reversal", "BUY"): "RSI Reversal Up",
+    ("Reversal", "SELL"): "RSI Reversal Down",
+    ("Breakout", "BUY"): "Breakout Up",
+    ("Breakout", "SELL"): "Breakout Down",
+}
+
+CONFIRM_COLUMNS = ["RSI", "MACD", "MACD_signal", "VWAP"]
+
+def evaluate_strategies(df):
+    # BUY/SELL/None for every strategy on every bar; expects calculate_indicators output
+    close = df["Close"]
+    rsi = df["RSI"]
+    macd_up = df["MACD"] > df["MACD_signal"]
+    macd_down = df["MACD"] < df["MACD_signal"]
+    recent_high = df["High"].rolling(window=20).max().shift(1)
+    recent_low = df["Low"].rolling(window=20).min().shift(1)
+    avg_volume = df["Volume"].rolling(window=20).mean()
+
+    signals = pd.DataFrame(index=df.index)
+    signals["Safe"] = np.where(macd_up & (close > df["VWAP"]), "BUY", "SELL")
+    signals["Min Investment"] = np.where(macd_up, "BUY", "SELL")
+    signals["Max Profit"] = np.where(macd_up & (rsi < 60), "BUY", "SELL")
+    signals["Reversal"] = np.select(
+        [(rsi < 30) & macd_up, (rsi > 70) & macd_down], ["BUY", "SELL"], default=None
+    )
+    signals["Breakout"] = np.select(
+        [(close > recent_high) & macd_up, (close < recent_low) & macd_down], ["BUY", "SELL"], default=None
+    )
+    signals["Volume OK"] = ~(df["Volume"] < 1.2 * avg_volume)
+    return signals
+
+def select_strike(strategy, signal, atm_strike, oi_data, chain):
+    if strategy == "Safe":
+        return oi_data["support_strike"] if signal == "BUY" else oi_data["resistance_strike"]
+    if strategy == "Min Investment":
+        cheapest = chain.cheapest("CE" if signal == "BUY" else "PE", low=5)
+        return atm_strike if cheapest is None else cheapest
+    if strategy == "Max Profit":
+        return atm_strike - 50 if signal == "BUY" else atm_strike + 50
+    if strategy == "Breakout":
+        return atm_strike + 50 if signal == "BUY" else atm_strike - 50
+    return atm_strike
+
+def confirm_timeframes(df, latest, rules, history=None):
+    # Drop each strategy's signal unless its last bar on every higher timeframe agrees
+    latest = latest.copy()
+    for rule in rules:
+        higher = timeframe_indicators(df, rule, history)
+        if higher.empty or higher[CONFIRM_COLUMNS].iloc[-1].isna().any():
+            # NaN compares as "SELL" in the strategy rules; too few bars to say either way
+            # means nothing is confirmed
+            print(f"Timeframe confirmation: not enough {rule} bars ({len(higher)}) for indicators")
+            metrics.incr("confirm.unavailable")
+            higher = None
+        else:
+            higher = evaluate_strategies(higher).iloc[-1]
+        for strategy in STRATEGIES:
+            if pd.isna(latest[strategy]) or higher is None or higher[strategy] != latest[strategy]:
+                latest[strategy] = None
+    return latest
+
 # ---------------------- MAIN SIGNAL GENERATOR ----------------------
-def generate_signals_multi(index, strike_type, expiry_date):
-    df = fetch_data(get_symbol(index))
+def latest_strategies(df, confirm_on=(), history=None):
+    latest = evaluate_strategies(df).iloc[-1]
+    if confirm_on and latest["Volume OK"]:
+        latest = confirm_timeframes(df, latest, confirm_on, history)
+    return latest, historical_vol(df["Close"])
+
+@metrics.timed("signals.index")
+def generate_signals_multi(index, strike_type, expiry_date, confirm_on=()):
+    # confirm_on: higher timeframes (e.g. "15min", "1h") that must give the same signal,
+    # all resampled from the one 5-minute download. Those need more sessions than the live
+    # 5-minute signals to warm up; the bar store already holds them, so this is a local read.
+    sessions = max([timeframes.sessions_needed(rule) for rule in confirm_on], default=timeframes.BASE_SESSIONS)
+    history = fetch_data(get_symbol(index), days=sessions)
+    df = timeframes.last_sessions(history, timeframes.BASE_SESSIONS)
     if df.empty:
         return pd.DataFrame(), None
 
-    df = calculate_indicators(df)
-    current = df.iloc[-1]
-    avg_volume = df["Volume"].rolling(window=20).mean().iloc[-1]
-    if current["Volume"] < 1.2 * avg_volume:
-        return pd.DataFrame(), round(current["Close"], 2)
-
-    last_price = round(current["Close"], 2)
+    # Indicators, strategy verdicts and rows are memoized on the last bar, so reruns inside
+    # a bar (or a changed strike type) skip straight to the layer that actually changed
+    bars = (index, memo.bar_key(df))
+    df = memo.frames.get_or_compute(("indicators", *bars), calculate_indicators, df)
+    latest, fallback_vol = memo.frames.get_or_compute(("strategies", *bars, confirm_on),
+                                                      latest_strategies, df, confirm_on, history)
+    last_price = round(df["Close"].iloc[-1], 2)
+    if not latest["Volume OK"]:
+        return pd.DataFrame(), last_price
+
+    chain = get_index_chain(index, expiry_date)
+    rows = memo.rows.get_or_compute(memo.chain_key(chain, "index", *bars, confirm_on, expiry_date), index_signal_rows,
+                                    index, latest, last_price, chain, expiry_date, fallback_vol)
+    return rows, last_price
+
+def index_signal_rows(index, latest, last_price, chain, expiry_date, fallback_vol):
     atm_strike = round(last_price / 50) * 50
-    oi_data = get_oi_levels(index)
-    option_chain = get_option_chain_ltp(index)
+    oi_data = oi_levels_for(chain)
+    # Label rows with the contract actually priced, which may follow the requested date
+    expiry_label = (chain.expiry or expiry_date).strftime("%d %b %Y")
+    pricer = priced_chain(chain, last_price, expiry_date, fallback_vol)
 
-    strategies = ["Safe", "Min Investment", "Max Profit", "Reversal", "Breakout"]
     results = []
-
-    for strategy in strategies:
-        if strategy == "Safe":
-            signal = "BUY" if current["MACD"] > current["MACD_signal"] and current["Close"] > current["VWAP"] else "SELL"
-            strike = oi_data["support_strike"] if signal == "BUY" else oi_data["resistance_strike"]
-            reason = "OI Support/Resistance"
-
-        elif strategy == "Min Investment":
-            best_strike, min_ltp = atm_strike, float("inf")
-            signal = "BUY" if current["MACD"] > current["MACD_signal"] else "SELL"
-            for k, v in option_chain.items():
-                ltp = v.get("CE" if signal == "BUY" else "PE")
-                if ltp and 5 < ltp < min_ltp:
-                    best_strike = k
-                    min_ltp = ltp
-            strike = best_strike
-            reason = "Lowest Premium"
-
-        elif strategy == "Max Profit":
-            signal = "BUY" if current["MACD"] > current["MACD_signal"] and current["RSI"] < 60 else "SELL"
-            strike = atm_strike - 50 if signal == "BUY" else atm_strike + 50
-            reason = "Momentum"
-
-        elif strategy == "Reversal":
-            if current["RSI"] < 30 and current["MACD"] > current["MACD_signal"]:
-                signal = "BUY"
-                strike = atm_strike
-                reason = "RSI Reversal Up"
-            elif current["RSI"] > 70 and current["MACD"] < current["MACD_signal"]:
-                signal = "SELL"
-                strike = atm_strike
-                reason = "RSI Reversal Down"
-            else:
-                continue
-
-        elif strategy == "Breakout":
-            recent_high = df["High"].rolling(window=20).max().iloc[-2]
-            recent_low = df["Low"].rolling(window=20).min().iloc[-2]
-            if current["Close"] > recent_high and current["MACD"] > current["MACD_signal"]:
-                signal = "BUY"
-                strike = atm_strike + 50
-                reason = "Breakout Up"
-            elif current["Close"] < recent_low and current["MACD"] < current["MACD_signal"]:
-                signal = "SELL"
-                strike = atm_strike - 50
-                reason = "Breakout Down"
-            else:
-                continue
-        else:
+    for strategy in STRATEGIES:
+        signal = latest[strategy]
+        if pd.isna(signal):
             continue
+        strike = select_strike(strategy, signal, atm_strike, oi_data, chain)
+        if strike is None:
+            strike = atm_strike
+        reason = STRATEGY_REASONS[(strategy, signal)]
 
         option_type = "CE" if signal == "BUY" else "PE"
-        entry = option_chain.get(strike, {}).get(option_type, round(40 + last_price % 20, 2))
-        target = round(entry * 2.1, 2)
-        sl = round(entry * 0.7, 2)
+        levels = pricer.levels(strike, option_type)
+        if levels is None:
+            continue
+        entry, target, sl = levels
 
         results.append({
             "Signal": f"{index} {signal} {strike} {option_type}",
@@ -163,42 +202,9 @@ def generate_signals_multi(index, strike_type, expiry_date):
             "Strategy": strategy,
             "Reason": reason,
             "Premium Band": premium_band(entry),
-            "Expiry": expiry_date.strftime("%d %b %Y"),
+            "Expiry": expiry_label,
             "Index LTP": last_price
         })
 
-    return pd.DataFrame(results), last_price
-
-# ---------------------- BACKTEST MOCKUP ----------------------
-def backtest_mock(df_signals):
-    results = []
-    for _, row in df_signals.iterrows():
-        entry = float(row["Entry"])
-        target = float(row["Target"])
-        sl = float(row["Stop Loss"])
-        mock_price = np.random.normal(loc=entry, scale=(target - sl) / 4)
-        if mock_price >= target:
-            outcome = "Target Hit"
-            profit = target - entry
-        elif mock_price <= sl:
-            outcome = "SL Hit"
-            profit = sl - entry
-        else:
-            outcome = "Hold"
-            profit = mock_price - entry
-        results.append({
-            "Signal": row["Signal"],
-            "Outcome": outcome,
-            "Profit": round(profit, 2),
-            "Strategy": row["Strategy"]
-        })
-
-    df_bt = pd.DataFrame(results)
-    summary = df_bt.groupby("Strategy").agg(
-        Trades=("Outcome", "count"),
-        Wins=("Outcome", lambda x: (x == "Target Hit").sum()),
-        Losses=("Outcome", lambda x: (x == "SL Hit").sum()),
-        Avg_PnL=("Profit", "mean")
-    )
-    summary["Win %"] = (summary["Wins"] / summary["Trades"] * 100).round(2)
-    return summary.reset_index()
+    metrics.incr("signals.emitted", len(results))
+    return pd.DataFrame(results)
@@ -0,0 +1,156 @@
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCAN_INTERVAL = 300          # seconds; one 5-minute bar
+IDLE_EXPIRY = 3 * SCAN_INTERVAL
+MAX_CONCURRENT_JOBS = 2
+RETRY_AFTER = 10             # seconds before a failed job runs again; doubles per failure up to the interval
+
+_NOTHING = object()
+
+# ---------------------- Background Signal Worker ----------------------
+class SignalWorker:
+    # Runs registered scans on a cadence and keeps the latest result of each as a snapshot.
+    # Jobs are keyed by their parameters, so every session asking for the same scan shares it.
+    def __init__(self, interval=SCAN_INTERVAL, idle_expiry=IDLE_EXPIRY):
+        self.interval = interval
+        self.idle_expiry = idle_expiry
+        self._jobs = {}
+        self._snapshots = {}
+        self._complete = set()      # keys whose snapshot is a finished run, not a partial
+        self._running = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix="signal-job")
+        self._thread = threading.Thread(target=self._loop, name="signal-worker", daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def subscribe(self, key, fn, *args):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                self._jobs[key] = {"fn": fn, "args": args, "last_read": time.time(),
+                                   "failures": 0, "failed_at": None, "error": None}
+            else:
+                job["last_read"] = time.time()
+            is_new = key not in self._snapshots
+        if is_new:
+            self._wake.set()
+
+    def latest(self, key):
+        # (published_at, result) or None if the first run has not finished yet
+        with self._lock:
+            if key in self._jobs:
+                self._jobs[key]["last_read"] = time.time()
+            return self._snapshots.get(key)
+
+    def publish(self, key, result, complete=True):
+        with self._lock:
+            if complete:
+                self._complete.add(key)
+            elif key in self._complete:
+                # A rescan's partials never replace the last finished result
+                return
+            self._snapshots[key] = (time.time(), result)
+
+    def is_running(self, key):
+        with self._lock:
+            return key in self._running
+
+    def is_complete(self, key):
+        with self._lock:
+            return key in self._complete
+
+    def last_error(self, key):
+        # Message of the job's most recent failure, cleared once it runs cleanly again
+        with self._lock:
+            job = self._jobs.get(key)
+            return job["error"] if job else None
+
+    def _record(self, key, error=None):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return
+            if error is None:
+                job["failures"], job["failed_at"], job["error"] = 0, None, None
+            else:
+                job["failures"] += 1
+                job["failed_at"] = time.time()
+                job["error"] = str(error) or type(error).__name__
+
+    def _next_run(self, job, snapshot):
+        if job["failures"]:
+            # Back off instead of retrying on every wake while the feed is down
+            return job["failed_at"] + min(RETRY_AFTER * 2 ** (job["failures"] - 1), self.interval)
+        return snapshot[0] + self.interval if snapshot else 0
+
+    def _execute(self, key, fn, args):
+        result = fn(*args)
+        if inspect.isgenerator(result):
+            # Streaming jobs show partial results until their first run finishes; the last
+            # value yielded is the complete result
+            final = _NOTHING
+            for final in result:
+                self.publish(key, final, complete=False)
+            if final is not _NOTHING:
+                self.publish(key, final)
+        else:
+            self.publish(key, result)
+
+    def run_now(self, key, fn, *args):
+        # Synchronous first run for callers that cannot wait for the next cycle; None if it
+        # failed and there is no earlier result (see last_error)
+        with self._lock:
+            self._running.add(key)
+        self.subscribe(key, fn, *args)
+        try:
+            self._execute(key, fn, args)
+            self._record(key)
+        except Exception as e:
+            print(f"Signal job {key} failed:", e)
+            self._record(key, e)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+        return self.latest(key)
+
+    def _run_job(self, key, fn, args):
+        try:
+            self._execute(key, fn, args)
+            self._record(key)
+        except Exception as e:
+            print(f"Signal job {key} failed:", e)
+            self._record(key, e)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+
+    def _due_jobs(self):
+        now = time.time()
+        due = []
+        with self._lock:
+            for key, job in list(self._jobs.items()):
+                if now - job["last_read"] > self.idle_expiry:
+                    # Nobody is looking at this scan any more
+                    del self._jobs[key]
+                    self._snapshots.pop(key, None)
+                    self._complete.discard(key)
+                    continue
+                if key not in self._running and now >= self._next_run(job, self._snapshots.get(key)):
+                    self._running.add(key)
+                    due.append((key, job["fn"], job["args"]))
+        return due
+
+    def _loop(self):
+        while True:
+            for key, fn, args in self._due_jobs():
+                self._executor.submit(self._run_job, key, fn, args)
+            self._wake.wait(timeout=1.0)
+            self._wake.clear()
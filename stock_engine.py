@@ -1,20 +1,36 @@
-import yfinance as yf
 import pandas as pd
-import requests
+import numpy as np
 from ta.momentum import RSIIndicator
 from ta.trend import MACD
 import datetime
+import heapq
+import itertools
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+import bar_store
+import memo
+import metrics
+import nse_client
+import parallel_screen
+from option_chain import OptionChain, get_chain, oi_levels_for
+from pricing import historical_vol, priced_chain
+from indicators import latest_indicators
+
+INDICATOR_COLUMNS = ["Close", "RSI", "MACD", "MACD_signal", "VWAP"]
+
+# Suggestion score weights (sum to 100) and the MACD gap, in % of price, that earns full marks
+RSI_WEIGHT = 40
+MACD_WEIGHT = 30
+OI_WEIGHT = 30
+MACD_GAP_FULL = 0.5
 
 # ---------------------- Fetch Full NSE F&O Stock List ----------------------
 def get_nse_fo_stocks():
     try:
-        url = "https://www.nseindia.com/api/liveEquity-derivatives"
-        headers = {"User-Agent": "Mozilla/5.0"}
-        session = requests.Session()
-        session.get("https://www.nseindia.com", headers=headers)
-        response = session.get(url, headers=headers)
-        data = response.json()
+        data = nse_client.get_fo_stock_payload()
         stocks = [item["symbol"] for item in data.get("data", []) if item.get("symbol")]
         return list(sorted(set(stocks)))
     except Exception as e:
@@ -22,83 +38,111 @@ def get_nse_fo_stocks():
         return []
 
 # ---------------------- Get Option Chain OI Levels ----------------------
-def get_stock_oi_levels(symbol):
-    headers = {"User-Agent": "Mozilla/5.0"}
+def get_stock_chain(symbol, expiry_date=None):
     try:
-        session = requests.Session()
-        session.get("https://www.nseindia.com", headers=headers)
-        url = f"https://www.nseindia.com/api/option-chain-equities?symbol={symbol}"
-        res = session.get(url, headers=headers)
-        data = res.json()
-
-        strike_data = []
-        for record in data["records"]["data"]:
-            strike = record.get("strikePrice")
-            ce = record.get("CE", {})
-            pe = record.get("PE", {})
-            ce_oi = ce.get("openInterest", 0)
-            pe_oi = pe.get("openInterest", 0)
-            strike_data.append({"strike": strike, "CE_OI": ce_oi, "PE_OI": pe_oi})
-
-        df = pd.DataFrame(strike_data)
-        max_pe = df.loc[df["PE_OI"].idxmax()]
-        max_ce = df.loc[df["CE_OI"].idxmax()]
-
-        return {
-            "support_strike": int(max_pe["strike"]),
-            "resistance_strike": int(max_ce["strike"]),
-            "support_oi": max_pe["PE_OI"],
-            "resistance_oi": max_ce["CE_OI"]
-        }
+        return get_chain(symbol, "equities", expiry_date)
     except:
+        return OptionChain.empty()
+
+def get_stock_oi_levels(symbol, expiry_date=None):
+    chain = get_stock_chain(symbol, expiry_date)
+    if not len(chain):
         return None
+    return oi_levels_for(chain)
 
 # ---------------------- Fetch Stock OHLC ----------------------
 def fetch_stock_data(symbol):
     try:
-        df = yf.download(symbol + ".NS", period="5d", interval="5m", progress=False)
-        df.dropna(inplace=True)
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-        return df
+        return bar_store.get_bars(symbol + ".NS", days=5)
     except:
         return pd.DataFrame()
 
 # ---------------------- Signal Check ----------------------
-def check_signal(df):
+def evaluate_stock_signals(df):
+    # BUY/SELL/None for every bar; expects the RSI, MACD and VWAP columns
+    buy = (df["RSI"] < 30) & (df["MACD"] > df["MACD_signal"]) & (df["Close"] > df["VWAP"])
+    sell = (df["RSI"] > 70) & (df["MACD"] < df["MACD_signal"]) & (df["Close"] < df["VWAP"])
+    return pd.Series(np.select([buy, sell], ["BUY", "SELL"], default=None), index=df.index)
+
+@metrics.timed("indicators.stock")
+def screen_stock(df, symbol=None):
+    # (verdict, latest indicator values) for the last bar; the values feed signal_score
+    metrics.incr("symbols.screened")
+    if symbol is not None:
+        return memo.frames.get_or_compute(("screen", symbol, memo.bar_key(df)), _screen_stock, df, symbol)
+    return _screen_stock(df)
+
+def _screen_stock(df, symbol=None):
     try:
-        df["RSI"] = RSIIndicator(close=df["Close"]).rsi()
-        macd = MACD(close=df["Close"])
-        df["MACD"] = macd.macd()
-        df["MACD_signal"] = macd.macd_signal()
-        df["VWAP"] = (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
-
-        latest = df.iloc[-1]
-        if latest["RSI"] < 30 and latest["MACD"] > latest["MACD_signal"] and latest["Close"] > latest["VWAP"]:
-            return "BUY"
-        elif latest["RSI"] > 70 and latest["MACD"] < latest["MACD_signal"] and latest["Close"] < latest["VWAP"]:
-            return "SELL"
+        if symbol is not None:
+            # Streaming path: only bars added since the last refresh are folded in
+            latest = latest_indicators(symbol, df)
         else:
-            return None
+            df["RSI"] = RSIIndicator(close=df["Close"]).rsi()
+            macd = MACD(close=df["Close"])
+            df["MACD"] = macd.macd()
+            df["MACD_signal"] = macd.macd_signal()
+            df["VWAP"] = (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
+            latest = {col: float(df[col].iloc[-1]) for col in INDICATOR_COLUMNS}
+        if not latest:
+            return None, None
+        verdict = evaluate_stock_signals(pd.DataFrame([latest])).iloc[-1]
+        return (None if pd.isna(verdict) else verdict), latest
     except:
-        return None
+        return None, None
+
+def check_signal(df, symbol=None):
+    return screen_stock(df, symbol)[0]
+
+# ---------------------- Signal Score ----------------------
+def signal_score(signal, indicators=None, oi_data=None):
+    # 0-100: how far RSI is past its threshold, how wide the MACD gap is relative to price,
+    # and how much of the max OI sits on the side backing the trade (put writers for a BUY)
+    indicators = indicators or {}
+    rsi = indicators.get("RSI", np.nan)
+    rsi_part = (30 - rsi) / 30 if signal == "BUY" else (rsi - 70) / 30
+    gap = abs(indicators.get("MACD", np.nan) - indicators.get("MACD_signal", np.nan))
+    macd_part = gap / indicators.get("Close", np.nan) * 100 / MACD_GAP_FULL
+
+    oi_part = np.nan
+    if oi_data:
+        backing, opposing = oi_data.get("support_oi", 0), oi_data.get("resistance_oi", 0)
+        if signal == "SELL":
+            backing, opposing = opposing, backing
+        if backing + opposing > 0:
+            oi_part = backing / (backing + opposing)
+
+    parts = np.nan_to_num(np.clip([rsi_part, macd_part, oi_part], 0, 1))
+    return round(float(parts @ [RSI_WEIGHT, MACD_WEIGHT, OI_WEIGHT]), 1)
 
 # ---------------------- Generate Signal for Specific Stock ----------------------
-def generate_stock_signals(stock, strategy, strike_type, expiry_date):
-    df = fetch_stock_data(stock)
+def generate_stock_signals(stock, strategy, strike_type, expiry_date, df=None):
+    if df is None:
+        df = fetch_stock_data(stock)
     if df.empty:
         return pd.DataFrame()
 
-    signal = check_signal(df)
+    signal, indicators = screen_stock(df, stock)
     if not signal:
         return pd.DataFrame()
 
-    last_price = round(df["Close"].iloc[-1], 2)
-    atm_strike = round(last_price / 10) * 10
-    oi_data = get_stock_oi_levels(stock)
+    return build_stock_signal(stock, signal, df, strategy, strike_type, expiry_date, indicators=indicators)
 
-    if not oi_data:
+def build_stock_signal(stock, signal, df, strategy, strike_type, expiry_date, rate_limiter=None, indicators=None):
+    if rate_limiter:
+        rate_limiter.wait()
+    chain = get_stock_chain(stock, expiry_date)
+    if not len(chain):
         return pd.DataFrame()
+    # Keyed on the chain's data identity, which stays the same until its payload refreshes
+    key = memo.chain_key(chain, "stock", stock, signal, memo.bar_key(df), strategy, strike_type, expiry_date)
+    return memo.rows.get_or_compute(key, _stock_signal_rows, stock, signal, df, strategy, strike_type,
+                                    expiry_date, chain, indicators)
+
+def _stock_signal_rows(stock, signal, df, strategy, strike_type, expiry_date, chain, indicators):
+    last_price = round(df["Close"].iloc[-1], 2)
+    atm_strike = round(last_price / 10) * 10
+    oi_data = oi_levels_for(chain)
 
     if signal == "BUY" and oi_data["support_strike"]:
         strike = oi_data["support_strike"]
@@ -116,10 +160,13 @@ def generate_stock_signals(stock, strategy, strike_type, expiry_date):
             strike = atm_strike + 10
 
     option_type = "CE" if signal == "BUY" else "PE"
-    entry = round(40 + (last_price % 20), 2)
-    target = round(entry * 2.1, 2)
-    sl = round(entry * 0.7, 2)
+    pricer = priced_chain(chain, last_price, expiry_date, historical_vol(df["Close"]))
+    levels = pricer.levels(strike, option_type)
+    if levels is None:
+        return pd.DataFrame()
+    entry, target, sl = levels
 
+    metrics.incr("signals.emitted")
     signal_data = {
         "Signal": [f"{stock.upper()} {signal} {strike} {option_type}"],
         "Entry": [entry],
@@ -127,31 +174,129 @@ def generate_stock_signals(stock, strategy, strike_type, expiry_date):
         "Stop Loss": [sl],
         "Strategy": [strategy],
         "Strike Type": [strike_type + f" ({source})"],
-        "Expiry": [expiry_date.strftime("%d %b %Y")],
-        "Stock LTP": [last_price]  # ✅ New column
+        "Expiry": [(oi_data.get("expiry") or expiry_date).strftime("%d %b %Y")],
+        "Stock LTP": [last_price],  # ✅ New column
+        "Score": [signal_score(signal, indicators, oi_data)],
     }
 
     return pd.DataFrame(signal_data)
 
-# ---------------------- Screen Stocks with Signals ----------------------
-def get_suggested_stocks(expiry_date, strategy="Safe", strike_type="ATM", limit=25):
-    fo_list = get_nse_fo_stocks()
-    suggestions = []
+# ---------------------- Batched OHLC Download ----------------------
+def fetch_stock_data_batch(symbols):
+    try:
+        with metrics.timer("fetch.stock_bars"):
+            frames = bar_store.get_bars_batch([s + ".NS" for s in symbols], days=5)
+    except Exception as e:
+        print("Batch download error:", e)
+        return {}
+    return {ticker[:-len(".NS")]: df for ticker, df in frames.items()}
 
-    for symbol in fo_list:
+def iter_fo_stock_chunks(symbols=None, chunk_size=bar_store.CHUNK_SIZE):
+    # Whole F&O list in chunked bulk downloads, yielding one {symbol: frame} dict per chunk
+    fo_list = symbols if symbols is not None else get_nse_fo_stocks()
+    fo_list = list(dict.fromkeys(fo_list))
+    for i in range(0, len(fo_list), chunk_size):
+        yield fetch_stock_data_batch(fo_list[i:i + chunk_size])
+
+def screen_chunk(frames, screen="thread"):
+    # (symbol, verdict, indicators) for a chunk: "thread" folds new bars into the per-symbol
+    # indicator state in-process, "process" recomputes every symbol in parallel across the CPU cores
+    if screen == "process":
         try:
-            df = fetch_stock_data(symbol)
-            if df.empty:
+            results = parallel_screen.screen_frames(frames)
+            return [(symbol, *results.get(symbol, (None, None))) for symbol in frames]
+        except BrokenProcessPool as e:
+            # The pool has been replaced for the next chunk; screen this one in-process
+            print("Process pool failed, screening chunk in-process:", e)
+    return [(symbol, *screen_stock(df, symbol)) for symbol, df in frames.items()]
+
+# ---------------------- Rate Limiter ----------------------
+class RateLimiter:
+    def __init__(self, calls_per_second):
+        self.interval = 1.0 / calls_per_second if calls_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# ---------------------- Concurrent Universe Scan ----------------------
+def scan_fo_universe(expiry_date, strategy="Safe", strike_type="ATM", symbols=None,
+                     batch_size=50, max_workers=8, rate_limit=5.0, screen="thread"):
+    # OHLC is downloaded once per batch; OI lookups run on a bounded, rate-limited pool
+    limiter = RateLimiter(rate_limit)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = set()
+
+    def drain(timeout):
+        nonlocal pending
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                symbol, suggestion_df = future.result()
+            except Exception:
                 continue
-            signal = check_signal(df)
-            if signal:
-                suggestion_df = generate_stock_signals(symbol, strategy, strike_type, expiry_date)
-                if not suggestion_df.empty:
-                    suggestions.append((symbol, suggestion_df))
-        except:
-            continue
+            if not suggestion_df.empty:
+                yield symbol, suggestion_df
+
+    try:
+        # Each symbol is fetched at most once per scan, even if the list repeats it
+        for frames in iter_fo_stock_chunks(symbols, batch_size):
+            for symbol, signal, indicators in screen_chunk(frames, screen):
+                if signal:
+                    future = executor.submit(
+                        lambda s=symbol, sig=signal, d=frames[symbol], ind=indicators: (
+                            s, build_stock_signal(s, sig, d, strategy, strike_type, expiry_date, limiter, ind)
+                        )
+                    )
+                    pending.add(future)
+            yield from drain(0)
+
+        while pending:
+            yield from drain(None)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        if len(suggestions) >= limit:
-            break
+# ---------------------- Screen Stocks with Signals ----------------------
+class TopK:
+    # Best k suggestions seen so far, on a min-heap so each new one costs O(log k)
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._seq = itertools.count()   # tie-breaker; frames are not comparable
+
+    def push(self, score, symbol, item):
+        entry = (score, next(self._seq), symbol, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            return False
+        return True
 
+    def ranked(self):
+        return [(symbol, item) for _, _, symbol, item in sorted(self._heap, key=lambda e: (-e[0], e[1]))]
+
+def stream_suggested_stocks(expiry_date, strategy="Safe", strike_type="ATM", limit=25, symbols=None, screen="thread"):
+    # Yields the current best `limit` (symbol, suggestion_df) pairs, by score, every time a
+    # qualifying symbol changes them, so callers can show results while the scan runs
+    top = TopK(limit)
+    with metrics.timer("scan.suggested"):
+        for symbol, suggestion_df in scan_fo_universe(expiry_date, strategy, strike_type, symbols, screen=screen):
+            if top.push(suggestion_df["Score"].iloc[0], symbol, suggestion_df):
+                yield top.ranked()
+    yield top.ranked()
+
+def get_suggested_stocks(expiry_date, strategy="Safe", strike_type="ATM", limit=25):
+    suggestions = []
+    for suggestions in stream_suggested_stocks(expiry_date, strategy, strike_type, limit):
+        pass
     return suggestions
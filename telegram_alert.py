@@ -1,48 +1,171 @@
+import os
 import requests
-import streamlit as st
-import csv
 from datetime import datetime
-import os
+import queue
+import threading
+import time
+from collections import deque
+
+from trade_store import log_trades
 
-# ✅ Load from Streamlit Secrets
-BOT_TOKEN = st.secrets["BOT_TOKEN"]
-CHAT_ID = st.secrets["CHAT_ID"]
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")   # or a replay server
+REQUEST_TIMEOUT = 10
+MAX_MESSAGE_LENGTH = 4096      # Telegram's limit per message
+MAX_ATTEMPTS = 4
+DEDUPE_TTL = 24 * 60 * 60      # seconds an identical signal is not re-sent
+
+# ✅ Load from the environment or Streamlit Secrets on first send, so the app starts without them
+_credentials = None
+
+def get_credentials():
+    global _credentials
+    if _credentials is None:
+        bot_token, chat_id = os.environ.get("TELEGRAM_BOT_TOKEN"), os.environ.get("TELEGRAM_CHAT_ID")
+        if not (bot_token and chat_id):
+            import streamlit as st
+            bot_token, chat_id = st.secrets["BOT_TOKEN"], st.secrets["CHAT_ID"]
+        _credentials = (bot_token, chat_id)
+    return _credentials
 
 # ✅ Send Telegram Message (Markdown + JSON method)
-def send_telegram_message(message):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+def _post_message(message, session=None):
+    bot_token, chat_id = get_credentials()
+    url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
     payload = {
-        "chat_id": CHAT_ID,
+        "chat_id": chat_id,
         "text": message,
         "parse_mode": "Markdown"  # You can switch to "HTML" if needed
     }
+    return (session or requests).post(url, json=payload, timeout=REQUEST_TIMEOUT)
+
+def send_telegram_message(message):
     try:
-        response = requests.post(url, json=payload)
+        response = _post_message(message)
         if response.status_code == 200:
-            st.success("✅ Sent to Telegram")
             return True
-        else:
-            st.error(f"❌ Telegram failed: {response.status_code} - {response.text}")
-            return False
+        print(f"Telegram failed: {response.status_code} - {response.text}")
+        return False
     except Exception as e:
-        st.error(f"Telegram Exception: {e}")
+        print("Telegram Exception:", e)
         return False
 
-# ✅ Log Trade to CSV
+# ✅ Background Dispatcher
+def _group_messages(items, limit=MAX_MESSAGE_LENGTH):
+    # Pack (message, row) items into as few groups as fit under Telegram's length limit
+    groups, current, length = [], [], 0
+    for item in items:
+        extra = len(item[0]) + (2 if current else 0)
+        if current and length + extra > limit:
+            groups.append(current)
+            current, length = [], 0
+            extra = len(item[0])
+        current.append(item)
+        length += extra
+    if current:
+        groups.append(current)
+    return groups
+
+IDENTITY_FIELDS = ("Signal", "Strategy", "Expiry")
+
+def signal_key(message, row=None):
+    # What makes two alerts the same signal: the contract, strategy and expiry. The text
+    # carries live LTP-derived prices that move every bar, so it only identifies rowless messages.
+    try:
+        return tuple(row[field] for field in IDENTITY_FIELDS)
+    except (KeyError, TypeError, IndexError):
+        return message
+
+class TelegramDispatcher:
+    # Sends queued signals from a daemon thread over one keep-alive session.
+    # submit() returns immediately; outcomes are kept in status() for the UI to show.
+    def __init__(self, coalesce=True, dedupe_ttl=DEDUPE_TTL):
+        self.coalesce = coalesce
+        self.dedupe_ttl = dedupe_ttl
+        self._queue = queue.Queue()
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._stats = {"sent": 0, "failed": 0, "duplicates": 0}
+        self._errors = deque(maxlen=20)
+        self._thread = threading.Thread(target=self._loop, name="telegram-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, messages, rows=None, on_sent=None):
+        # messages and rows are parallel lists; on_sent(rows) runs once per delivered message
+        rows = rows if rows is not None else [None] * len(messages)
+        now = time.time()
+        fresh = []
+        with self._lock:
+            for key in [k for k, t in self._seen.items() if now - t > self.dedupe_ttl]:
+                del self._seen[key]
+            for message, row in zip(messages, rows):
+                key = signal_key(message, row)
+                if key in self._seen:
+                    self._stats["duplicates"] += 1
+                    continue
+                self._seen[key] = now
+                fresh.append((message, row))
+        if not fresh:
+            return 0
+
+        if self.coalesce:
+            for members in _group_messages(fresh):
+                self._queue.put(("\n\n".join(m for m, _ in members), members, on_sent))
+        else:
+            for message, row in fresh:
+                self._queue.put((message, [(message, row)], on_sent))
+        return len(fresh)
+
+    def status(self):
+        with self._lock:
+            return {**self._stats, "pending": self._queue.qsize(), "errors": list(self._errors)}
+
+    def _deliver(self, text):
+        try:
+            get_credentials()
+        except Exception as e:
+            return f"Telegram not configured: {e}"
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response = _post_message(text, self._session)
+            except requests.RequestException as e:
+                error = f"Telegram Exception: {e}"
+                time.sleep(2 ** attempt)
+                continue
+            if response.status_code == 200:
+                return None
+            error = f"Telegram failed: {response.status_code} - {response.text}"
+            if response.status_code == 429:
+                try:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                except ValueError:
+                    retry_after = 1
+                time.sleep(retry_after)
+            elif response.status_code >= 500:
+                time.sleep(2 ** attempt)
+            else:
+                break
+        return error
+
+    def _loop(self):
+        while True:
+            text, members, on_sent = self._queue.get()
+            error = self._deliver(text)
+            with self._lock:
+                if error is None:
+                    self._stats["sent"] += len(members)
+                else:
+                    self._stats["failed"] += len(members)
+                    self._errors.append(f"{datetime.now():%H:%M:%S} {error}")
+                    # Let a failed signal go out again on a later refresh
+                    for message, row in members:
+                        self._seen.pop(signal_key(message, row), None)
+            if error is None and on_sent:
+                try:
+                    on_sent([row for _, row in members])
+                except Exception as e:
+                    print("Telegram on_sent error:", e)
+
+# ✅ Log Trade to the trade store
 def log_trade(row):
-    file_path = "trade_log.csv"
-    file_exists = os.path.isfile(file_path)
-
-    with open(file_path, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(["Timestamp", "Signal", "Entry", "Target", "Stop Loss", "Strategy", "Expiry"])
-        writer.writerow([
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            row["Signal"],
-            row["Entry"],
-            row["Target"],
-            row["Stop Loss"],
-            row["Strategy"],
-            row["Expiry"]
-        ])
+    log_trades([row])
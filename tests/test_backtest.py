@@ -0,0 +1,39 @@
+import numpy as np
+
+from backtest_engine import (OUTCOME_EXPIRY, OUTCOME_SL, OUTCOME_TARGET, _take_sequential,
+                             resolve_exits, trade_levels)
+from pricing import option_levels
+
+CLOSE = np.array([100, 101, 102, 103, 104, 103, 102, 101, 100, 99], dtype=float)
+HIGH = CLOSE + 0.5
+LOW = CLOSE - 0.5
+
+def test_resolve_exits_by_hand():
+    entries = np.array([0, 1, 2, 5, 8])
+    direction = np.array([1, 1, -1, 1, 1])
+    target = np.array([103.0, 102.2, 100.0, 110.0, 200.0])
+    stop = np.array([98.0, 101.6, 103.2, 90.0, 0.0])
+    exit_idx, outcome = resolve_exits(HIGH, LOW, CLOSE, entries, direction, target, stop, max_hold=3)
+    # 0: high 103.5 on bar 3 reaches the target
+    # 1: bar 2 spans both 102.2 and 101.6, booked as the stop
+    # 2: short, bar 3's high 103.5 reaches the 103.2 stop
+    # 3: neither level inside three bars, out on bar 8
+    # 4: runs off the end of the data, out on the last bar
+    assert exit_idx.tolist() == [3, 2, 3, 8, 9]
+    assert outcome.tolist() == [OUTCOME_TARGET, OUTCOME_SL, OUTCOME_SL, OUTCOME_EXPIRY, OUTCOME_EXPIRY]
+
+def test_take_sequential_skips_overlapping_signals():
+    entries = np.array([0, 1, 2, 5, 8])
+    exit_idx = np.array([3, 2, 3, 8, 9])
+    # Entries 1 and 2 open while trade 0 runs; entry 8 fires on trade 5's exit bar
+    assert _take_sequential(entries, exit_idx).tolist() == [0, 3]
+
+def test_backtest_levels_follow_option_levels():
+    spot, vol = np.array([20000.0, 20000.0]), np.array([0.15, 0.15])
+    direction = np.array([1, -1])
+    entry, target, stop, target_level, stop_level = trade_levels(spot, np.array([120.0, 110.0]), vol, direction)
+    expected = option_levels(spot, spot, 3.5 / 365, vol, direction > 0, entry=np.array([120.0, 110.0]))
+    np.testing.assert_allclose([entry, target, stop], expected)
+    # Long trades aim above spot and stop below it; shorts the reverse
+    assert target_level[0] > 20000 > stop_level[0]
+    assert target_level[1] < 20000 < stop_level[1]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorState, latest_indicators, reset_indicators
+from signal_engine import calculate_indicators
+
+COLUMNS = ["RSI", "MACD", "MACD_signal", "VWAP"]
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 200))
+    index = pd.date_range("2026-10-12 09:15", periods=len(close), freq="5min", tz="Asia/Kolkata")
+    return pd.DataFrame({
+        "Open": close, "High": close + rng.uniform(0, 1, len(close)),
+        "Low": close - rng.uniform(0, 1, len(close)), "Close": close,
+        "Volume": rng.integers(1_000, 10_000, len(close)).astype(float),
+    }, index=index)
+
+def assert_matches(values, expected):
+    for col in COLUMNS:
+        if np.isnan(expected[col]):
+            assert np.isnan(values[col]), col
+        else:
+            assert values[col] == pytest.approx(expected[col], rel=1e-9, abs=1e-9), col
+
+def test_state_matches_ta_on_every_bar(bars):
+    expected = calculate_indicators(bars)
+    state = IndicatorState()
+    for i, (ts, row) in enumerate(bars.iterrows()):
+        values = state.update(row["High"], row["Low"], row["Close"], row["Volume"], ts)
+        assert_matches(values, expected.iloc[i])
+
+def test_peek_does_not_commit(bars):
+    state = IndicatorState()
+    for ts, row in bars.iloc[:-1].iterrows():
+        state.update(row["High"], row["Low"], row["Close"], row["Volume"], ts)
+    before = state.values()
+    last = bars.iloc[-1]
+    peeked = state.peek(last["High"], last["Low"], last["Close"], last["Volume"], bars.index[-1])
+    assert_matches(peeked, calculate_indicators(bars).iloc[-1])
+    assert state.values() == before
+
+def test_latest_indicators_follows_a_forming_bar(bars):
+    reset_indicators("TEST")
+    try:
+        # The final bar is re-read on each refresh, then new bars append behind it
+        for stop in (150, 150, 151, 200):
+            frame = bars.iloc[:stop].copy()
+            if stop == 150:
+                frame.iloc[-1, frame.columns.get_loc("Close")] += 0.3
+            assert_matches(latest_indicators("TEST", frame), calculate_indicators(frame).iloc[-1])
+    finally:
+        reset_indicators("TEST")
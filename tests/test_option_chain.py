@@ -0,0 +1,14 @@
+import nse_client
+import option_chain
+from benchmarks import fixtures
+
+def test_levels_table_matches_each_expiry(monkeypatch):
+    payload = fixtures.option_chain_payload("RELIANCE")
+    monkeypatch.setattr(nse_client, "get_option_chain", lambda symbol, kind: payload)
+    full = option_chain.get_chain("RELIANCE", "equities")
+    assert len(full.expiry_dates) > 1
+    for expiry in full.expiry_dates:
+        view = option_chain.get_chain("RELIANCE", "equities", expiry)
+        assert option_chain.oi_levels_for(view) == view.oi_levels()
+    # Undated lookups get the nearest contract, not the max across all of them
+    assert option_chain.oi_levels_for(full) == full.for_expiry().oi_levels()
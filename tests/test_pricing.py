@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from option_chain import OptionChain
+from pricing import MIN_PREMIUM, PricedChain, bs_price, implied_vol, option_levels
+
+def test_implied_vol_round_trip():
+    strikes = np.array([18000, 19000, 19500, 20000, 20500, 21000, 22000], dtype=float)
+    vols = np.array([0.35, 0.25, 0.18, 0.14, 0.16, 0.22, 0.40])
+    spot, t = 20000.0, 7 / 365
+    for is_call in (True, False):
+        prices = bs_price(spot, strikes, t, vols, is_call)
+        assert implied_vol(prices, spot, strikes, t, is_call) == pytest.approx(vols, abs=1e-4)
+
+def test_implied_vol_is_nan_below_intrinsic():
+    assert np.isnan(implied_vol(50.0, 20000.0, 19000.0, 7 / 365, True))
+
+def test_tick_priced_entry_keeps_a_non_negative_stop():
+    entry, target, stop = option_levels(20000.0, 21500.0, 2 / 365, 0.12, True, entry=MIN_PREMIUM)
+    assert entry == MIN_PREMIUM
+    assert stop == MIN_PREMIUM
+    assert target > entry
+
+def test_levels_bracket_the_entry():
+    entry, target, stop = option_levels(20000.0, 20000.0, 3.5 / 365, 0.15, False, entry=120.0)
+    assert stop < entry < target
+
+def test_tick_priced_strikes_are_not_signalled():
+    strikes = np.array([19000.0, 20000.0, 21000.0])
+    ce = {"ltp": np.array([1010.0, 150.0, MIN_PREMIUM]), "oi": np.zeros(3), "iv": np.full(3, np.nan),
+          "volume": np.zeros(3)}
+    pe = {"ltp": np.array([MIN_PREMIUM, 140.0, 990.0]), "oi": np.zeros(3), "iv": np.full(3, np.nan),
+          "volume": np.zeros(3)}
+    pricer = PricedChain(OptionChain(strikes, ce, pe), 20000.0, date.today() + timedelta(days=7))
+    assert pricer.levels(21000, "CE") is None
+    assert pricer.levels(19000, "PE") is None
+    entry, target, stop = pricer.levels(20000, "CE")
+    assert stop < entry < target
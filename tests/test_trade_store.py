@@ -0,0 +1,52 @@
+import csv
+
+import pytest
+
+import trade_store
+
+FIELDS = ["Timestamp", "Signal", "Entry", "Target", "Stop Loss", "Strategy", "Expiry"]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(trade_store, "DB_PATH", str(tmp_path / "trades.db"))
+    monkeypatch.setattr(trade_store, "LEGACY_CSV", str(tmp_path / "trade_log.csv"))
+    yield tmp_path
+    for conn in getattr(trade_store._local, "conns", {}).values():
+        conn.close()
+    trade_store._local.conns = {}
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_legacy_csv_is_imported_once(store):
+    write_csv(trade_store.LEGACY_CSV, [
+        {"Timestamp": "2024-11-01 10:00:00", "Signal": "NIFTY BUY 24000 CE", "Entry": "120.5",
+         "Target": "150", "Stop Loss": "100", "Strategy": "Safe", "Expiry": "07 Nov 2024"},
+        {"Timestamp": "2024-11-01 11:00:00", "Signal": "RELIANCE SELL 1300 PE", "Entry": "n/a",
+         "Target": "40", "Stop Loss": "20", "Strategy": "Reversal", "Expiry": "28 Nov 2024"},
+    ])
+    assert trade_store.count_trades() == 2
+    assert not (store / "trade_log.csv").exists()
+    assert (store / "trade_log.csv.imported").exists()
+
+    page = trade_store.query_trades()
+    assert page["Signal"].tolist() == ["RELIANCE SELL 1300 PE", "NIFTY BUY 24000 CE"]
+    assert page["Entry"].isna().tolist() == [True, False]
+    assert trade_store.count_trades(symbol="nifty") == 1
+
+def test_failed_import_is_retried(store):
+    # A row missing a column fails the import; the file stays put and the next connect retries
+    with open(trade_store.LEGACY_CSV, "w", newline="") as f:
+        f.write("Timestamp,Signal\n2024-11-01 10:00:00,NIFTY BUY 24000 CE\n")
+    with pytest.raises(KeyError):
+        trade_store.count_trades()
+    assert (store / "trade_log.csv").exists()
+
+    write_csv(trade_store.LEGACY_CSV, [
+        {"Timestamp": "2024-11-01 10:00:00", "Signal": "NIFTY BUY 24000 CE", "Entry": "120",
+         "Target": "150", "Stop Loss": "100", "Strategy": "Safe", "Expiry": "07 Nov 2024"},
+    ])
+    assert trade_store.count_trades() == 1
@@ -0,0 +1,36 @@
+import math
+
+import pandas as pd
+
+BASE_TIMEFRAME = "5min"
+TIMEFRAMES = ["15min", "1h"]
+SESSION_OPEN = "9h15min"      # NSE opens 09:15 IST; higher bars are anchored there
+SESSION_MINUTES = 375         # 09:15-15:30
+BASE_SESSIONS = 5             # sessions of 5-minute bars the live signals are computed on
+WARMUP_BARS = 100             # MACD's signal line needs 34 bars; give the EMAs room to settle
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# ---------------------- Resampling ----------------------
+def resample_bars(df, rule, carry=()):
+    # Higher-timeframe OHLCV from the 5-minute base bars already in memory. Columns in
+    # `carry` (cumulative series such as VWAP) take their value at each bar's close.
+    if df.empty or rule == BASE_TIMEFRAME or not isinstance(df.index, pd.DatetimeIndex):
+        return df
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in df.columns}
+    agg.update({col: "last" for col in carry if col in df.columns})
+    # Overnight and weekend bins come back empty; drop them rather than forward-filling
+    return df.resample(rule, origin="start_day", offset=SESSION_OPEN).agg(agg).dropna(subset=["Close"])
+
+def sessions_needed(rule, warmup=WARMUP_BARS):
+    # Sessions of base bars that resample to `warmup` bars of `rule`, plus today's partial one
+    per_session = math.ceil(SESSION_MINUTES / (pd.Timedelta(rule).total_seconds() / 60))
+    return max(math.ceil(warmup / per_session) + 1, BASE_SESSIONS)
+
+def last_sessions(df, sessions):
+    # The trailing `sessions` trading days of an intraday frame
+    if df.empty:
+        return df
+    days = df.index.normalize()
+    starts = days.unique()
+    return df if len(starts) <= sessions else df[days >= starts[-sessions]]
@@ -0,0 +1,144 @@
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_PATH = os.environ.get("TRADE_DB_PATH", "trade_log.db")
+LEGACY_CSV = "trade_log.csv"
+PAGE_SIZE = 50
+# What the engines log (signal_engine.STRATEGIES); fixed, so the filter needs no query
+STRATEGIES = ["Safe", "Min Investment", "Max Profit", "Reversal", "Breakout"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    symbol TEXT,
+    signal TEXT,
+    entry REAL,
+    target REAL,
+    stop_loss REAL,
+    strategy TEXT,
+    expiry TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_strategy ON trades (strategy, timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades (symbol, timestamp);
+"""
+
+DISPLAY_COLUMNS = {
+    "timestamp": "Timestamp",
+    "signal": "Signal",
+    "entry": "Entry",
+    "target": "Target",
+    "stop_loss": "Stop Loss",
+    "strategy": "Strategy",
+    "expiry": "Expiry",
+}
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+# ---------------------- Connection ----------------------
+def _connect(path=None):
+    path = path or DB_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with _init_lock:
+                if path not in _initialized:
+                    conn.executescript(SCHEMA)
+                    _import_legacy_csv(conn)
+                    _initialized.add(path)
+        except Exception:
+            # Not cached, so the next call retries the schema and CSV import
+            conn.close()
+            raise
+        conns[path] = conn
+    return conn
+
+def _import_legacy_csv(conn):
+    # One-time move of the old append-only CSV into the database
+    if not os.path.isfile(LEGACY_CSV):
+        return
+    if conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone():
+        return
+    with open(LEGACY_CSV, newline="") as f:
+        rows = list(csv.DictReader(f))
+    with conn:
+        conn.executemany(
+            "INSERT INTO trades (timestamp, symbol, signal, entry, target, stop_loss, strategy, expiry) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [_values(r, r.get("Timestamp")) for r in rows],
+        )
+    os.replace(LEGACY_CSV, LEGACY_CSV + ".imported")
+
+# ---------------------- Writes ----------------------
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _values(row, timestamp):
+    signal = str(row["Signal"])
+    return (
+        timestamp,
+        signal.split(" ", 1)[0].upper(),
+        signal,
+        _to_float(row["Entry"]),
+        _to_float(row["Target"]),
+        _to_float(row["Stop Loss"]),
+        row["Strategy"],
+        row["Expiry"],
+    )
+
+def log_trades(rows):
+    rows = list(rows)
+    if not rows:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO trades (timestamp, symbol, signal, entry, target, stop_loss, strategy, expiry) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [_values(row, timestamp) for row in rows],
+        )
+
+# ---------------------- Reads ----------------------
+def _where(strategy=None, symbol=None, since=None):
+    clauses, params = [], []
+    if strategy:
+        clauses.append("strategy = ?")
+        params.append(strategy)
+    if symbol:
+        clauses.append("symbol = ?")
+        params.append(symbol.upper())
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def query_trades(page=0, page_size=PAGE_SIZE, strategy=None, symbol=None, since=None):
+    where, params = _where(strategy, symbol, since)
+    sql = (f"SELECT {', '.join(DISPLAY_COLUMNS)} FROM trades{where} "
+           "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?")
+    rows = _connect().execute(sql, params + [page_size, page * page_size]).fetchall()
+    import pandas as pd  # only the history table needs it; keeps the page shell's imports light
+    return pd.DataFrame(rows, columns=list(DISPLAY_COLUMNS.values()))
+
+def count_trades(strategy=None, symbol=None, since=None):
+    if not (strategy or symbol or since):
+        # Rows are only ever appended, so the last id is the row count without a scan
+        return _connect().execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0]
+    where, params = _where(strategy, symbol, since)
+    return _connect().execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]